@@ -0,0 +1,10 @@
+import pytest
+
+from core.testing import testing_settings
+
+
+@pytest.fixture(autouse=True)
+def yatube_test_settings(settings, tmp_path):
+    """Те же настройки, что у manage.py test; кэш свой у каждого теста."""
+    for name, value in testing_settings(str(tmp_path / 'cache')).items():
+        setattr(settings, name, value)
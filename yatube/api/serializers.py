@@ -0,0 +1,55 @@
+class InvalidFields(ValueError):
+    """В ?fields= запрошены поля, которых нет у объекта."""
+
+
+POST_FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date,
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group_id else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'image_width': lambda post: post.image_width,
+    'image_height': lambda post: post.image_height,
+    'comments_count': lambda post: post.comments_count,
+}
+
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.pk,
+    'post': lambda comment: comment.post_id,
+    'text': lambda comment: comment.text,
+    'pub_date': lambda comment: comment.pub_date,
+    'author': lambda comment: comment.author.username,
+}
+
+
+def requested_fields(request, available):
+    """
+    Поля из ?fields=a,b в порядке запроса; без параметра — все.
+    Неизвестное поле вызывает InvalidFields.
+    """
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(available)
+    fields = list(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise InvalidFields(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(available)}.'
+        )
+    return fields
+
+
+def serialize(obj, fields, available):
+    return {name: available[name](obj) for name in fields}
+
+
+def serialize_page(page, fields, available):
+    return {
+        'results': [serialize(obj, fields, available) for obj in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.tests.utils import QueryBudgetMixin
+from posts.views import POSTS_PER_PAGE
+
+User = get_user_model()
+NUMBER_OF_POSTS: int = POSTS_PER_PAGE + 3
+
+
+class ApiViewsTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(NUMBER_OF_POSTS):
+            cls.post = Post.objects.create(
+                text=f'Тестовый пост #{number}',
+                author=cls.author,
+                group=cls.group,
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_feeds_paginated_by_cursor(self):
+        """Ленты отдаются страницами, next ведёт на остаток ленты."""
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_list', kwargs={'slug': self.group.slug}),
+            reverse('api:profile', kwargs={'username': 'author'}),
+            reverse('api:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.authorized_client.get(url).json()
+                self.assertEqual(len(first['results']), POSTS_PER_PAGE)
+                self.assertIsNone(first['previous'])
+                rest = self.authorized_client.get(
+                    url, {'cursor': first['next']}
+                ).json()
+                self.assertEqual(
+                    len(rest['results']), NUMBER_OF_POSTS - POSTS_PER_PAGE
+                )
+                self.assertIsNone(rest['next'])
+                self.assertEqual(
+                    first['results'][0]['text'], self.post.text
+                )
+
+    def test_fields_selection(self):
+        """?fields= оставляет только запрошенные поля."""
+        response = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk}),
+            {'fields': 'id,author'},
+        )
+        self.assertEqual(
+            response.json(), {'id': self.post.pk, 'author': 'author'}
+        )
+        response = self.guest_client.get(
+            reverse('api:index'), {'fields': 'id,secret'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail_and_comments(self):
+        post = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk})
+        ).json()
+        self.assertEqual(post['group'], self.group.slug)
+        self.assertEqual(post['comments_count'], 1)
+        comments = self.guest_client.get(
+            reverse('api:post_comments', kwargs={'post_id': self.post.pk})
+        ).json()
+        self.assertEqual(
+            [comment['author'] for comment in comments['results']],
+            ['reader'],
+        )
+
+    def test_follow_requires_login(self):
+        response = self.guest_client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_missing_objects(self):
+        urls = (
+            reverse('api:post_detail', kwargs={'post_id': 0}),
+            reverse('api:group_list', kwargs={'slug': 'missing'}),
+            reverse('api:profile', kwargs={'username': 'missing'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    def test_guest_query_budget(self):
+        budgets = {
+            reverse('api:index'): 1,
+            reverse('api:group_list', kwargs={'slug': self.group.slug}): 2,
+            reverse('api:profile', kwargs={'username': 'author'}): 2,
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk}): 1,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.guest_client, url, budget)
@@ -0,0 +1,131 @@
+from functools import wraps
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_safe
+
+from core.page_cache import tag_response
+from posts.autocomplete import autocomplete_index, suggestion_url
+from posts.caching import feed_etag, page_tags, post_etag, post_tags
+from posts.feeds import comment_list, group_feed, index_feed, profile_feed
+from posts.models import Group, Post, User
+from posts.views import COMMENTS_PER_PAGE, follow_pagination, pagination
+
+from .serializers import (COMMENT_FIELDS, POST_FIELDS, InvalidFields,
+                          requested_fields, serialize, serialize_page)
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def api_view(view):
+    """Только GET/HEAD; ошибка в ?fields= — ответ 400."""
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except InvalidFields as error:
+            return json_response({'detail': str(error)}, status=400)
+    return wrapper
+
+
+def posts_page(request, posts, *tags):
+    return page_response(
+        request, pagination(request, object_list=posts, cursor=True), *tags
+    )
+
+
+def page_response(request, page, *tags):
+    fields = requested_fields(request, POST_FIELDS)
+    return tag_response(
+        json_response(serialize_page(page, fields, POST_FIELDS)),
+        *tags, *page_tags(page),
+    )
+
+
+@api_view
+@condition(etag_func=feed_etag)
+def index(request):
+    return posts_page(request, index_feed(), 'feed:index')
+
+
+@api_view
+@condition(etag_func=feed_etag)
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return posts_page(request, group_feed(group), f'group:{group.pk}')
+
+
+@api_view
+@condition(etag_func=feed_etag)
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return posts_page(request, profile_feed(author), f'user:{author.pk}')
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return json_response(
+            {'detail': 'Требуется авторизация.'}, status=401
+        )
+    return page_response(request, follow_pagination(request))
+
+
+@api_view
+@condition(etag_func=post_etag)
+def post_detail(request, post_id):
+    fields = requested_fields(request, POST_FIELDS)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    return tag_response(
+        json_response(serialize(post, fields, POST_FIELDS)),
+        *post_tags(post),
+    )
+
+
+@api_view
+@condition(etag_func=post_etag)
+def post_comments(request, post_id):
+    fields = requested_fields(request, COMMENT_FIELDS)
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    comments = pagination(
+        request,
+        object_list=comment_list(post),
+        per_page=COMMENTS_PER_PAGE,
+        cursor=True,
+    )
+    return tag_response(
+        json_response(serialize_page(comments, fields, COMMENT_FIELDS)),
+        f'post:{post.pk}',
+        *(f'user:{comment.author_id}' for comment in comments),
+    )
+
+
+@api_view
+def autocomplete(request):
+    """Подсказки по началу имени пользователя, slug или названия группы."""
+    kind = request.GET.get('kind') or None
+    if kind not in (None, 'user', 'group'):
+        return json_response(
+            {'detail': 'kind: user или group.'}, status=400
+        )
+    suggestions = autocomplete_index.search(
+        request.GET.get('q', '').strip(), kind=kind
+    )
+    return json_response({'results': [
+        {
+            'type': suggestion.kind,
+            'value': suggestion.value,
+            'label': suggestion.label,
+            'url': suggestion_url(suggestion),
+        }
+        for suggestion in suggestions
+    ]})
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.db import connections
+from sorl.thumbnail.kvstores.base import KVStoreBase
+
+MEMORY_URI: str = 'file:thumbnail-kvstore?mode=memory&cache=shared'
+BUSY_TIMEOUT: int = 5
+
+
+class SQLiteKVStore(KVStoreBase):
+    """
+    Хранилище ключей sorl-thumbnail в отдельном SQLite-файле
+    (THUMBNAIL_KVSTORE_PATH) в режиме WAL. Файл общий для всех
+    процессов и переживает перезапуск; чтение в WAL не ждёт
+    записи и не ходит ни в основную базу, ни в кэш.
+
+    Если основная база в памяти (тесты), метаданные тоже держатся
+    в памяти процесса и не переживают прогон.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._local = threading.local()
+        self._memory_anchor = None
+
+    def _connect(self):
+        if self._in_memory():
+            if self._memory_anchor is None:
+                # Общая база в памяти живёт, пока открыто хоть одно
+                # соединение с ней.
+                self._memory_anchor = sqlite3.connect(
+                    MEMORY_URI, uri=True, check_same_thread=False
+                )
+            db = sqlite3.connect(MEMORY_URI, uri=True, timeout=BUSY_TIMEOUT)
+        else:
+            path = settings.THUMBNAIL_KVSTORE_PATH
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            db = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        db.isolation_level = None
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS kvstore '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID'
+        )
+        return db
+
+    @staticmethod
+    def _in_memory():
+        main = connections['default']
+        return main.vendor == 'sqlite' and main.is_in_memory_db()
+
+    @property
+    def db(self):
+        # Соединение своё у каждого потока и каждого процесса:
+        # после fork унаследованное соединение не используется.
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.db = self._connect()
+            self._local.pid = pid
+        return self._local.db
+
+    def _get_raw(self, key):
+        row = self.db.execute(
+            'SELECT value FROM kvstore WHERE key = ?', (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_raw(self, key, value):
+        self.db.execute(
+            'INSERT OR REPLACE INTO kvstore (key, value) VALUES (?, ?)',
+            (key, value),
+        )
+
+    def _delete_raw(self, *keys):
+        self.db.executemany(
+            'DELETE FROM kvstore WHERE key = ?', [(key,) for key in keys]
+        )
+
+    def _find_keys_raw(self, prefix):
+        # Диапазон по первичному ключу вместо LIKE: идёт по индексу.
+        rows = self.db.execute(
+            'SELECT key FROM kvstore WHERE key >= ? AND key < ?',
+            (prefix, prefix + '\U0010ffff'),
+        )
+        return [key for key, in rows]
@@ -0,0 +1,160 @@
+import logging
+from collections import Counter
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .page_cache import page_key, tag_versions
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Страница выполнила больше SQL-запросов, чем ей разрешено."""
+
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'SAVEPOINT', 'RELEASE', 'ROLLBACK')
+
+
+class QueryCollector:
+    """
+    Обёртка для connection.execute_wrapper: считает запросы, их время
+    и одинаковые по форме запросы (SQL без параметров).
+    """
+
+    def __init__(self, ignore=()):
+        self.shapes = Counter()
+        self.duration = 0.0
+        self.ignore = ignore
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.shapes[sql] += 1
+
+    @property
+    def count(self):
+        return sum(self.shapes.values())
+
+    @property
+    def duplicates(self):
+        """Число повторов одних и тех же запросов — признак N+1."""
+        return self.count - len(self.shapes)
+
+    @property
+    def budgeted(self):
+        """
+        Запросы, которые идут в бюджет: без управления транзакциями
+        и без запросов к таблицам из QUERY_GUARD_IGNORE.
+        """
+        return sum(
+            times for sql, times in self.shapes.items()
+            if not sql.startswith(TRANSACTION_STATEMENTS)
+            and not any(table in sql for table in self.ignore)
+        )
+
+    def repeated(self):
+        return {sql: times for sql, times in self.shapes.items() if times > 1}
+
+
+class QueryCountMiddleware:
+    """
+    Добавляет к ответу заголовки с числом SQL-запросов, их временем
+    и числом повторов. Если включён QUERY_GUARD_RAISE, превышение
+    бюджета из QUERY_BUDGETS для представления вызывает исключение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector(settings.QUERY_GUARD_IGNORE)
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = collector.count
+        response['X-Query-Time'] = f'{collector.duration * 1000:.2f}'
+        response['X-Query-Duplicates'] = collector.duplicates
+        if collector.duplicates:
+            logger.info(
+                'Повторяющиеся запросы на %s: %s',
+                request.path, collector.repeated(),
+            )
+
+        budget = self.get_budget(request)
+        if (
+            settings.QUERY_GUARD_RAISE
+            and budget is not None
+            and collector.budgeted > budget
+        ):
+            raise QueryBudgetExceeded(
+                f'{request.path}: выполнено запросов {collector.budgeted}, '
+                f'бюджет {budget}'
+            )
+        return response
+
+    @staticmethod
+    def get_budget(request):
+        match = request.resolver_match
+        if match is None:
+            return None
+        return settings.QUERY_BUDGETS.get(match.view_name)
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Кэширует страницы целиком для гостей. Кэшируются только ответы,
+    помеченные tag_response; запись живёт, пока не сброшен ни один
+    из её тегов (purge_tags) и не истёк PAGE_CACHE_TIMEOUT.
+    Запросы с cookie сессии обходят кэш.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+
+        key = page_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            versions, response = cached
+            if tag_versions(versions) == versions:
+                response['X-Page-Cache'] = 'hit'
+                return response
+
+        response = self.get_response(request)
+        tags = getattr(response, 'cache_tags', None)
+        if tags and self.is_cacheable_response(request, response):
+            if hasattr(response, 'render'):
+                response.render()
+            response['X-Page-Cache'] = 'miss'
+            cache.set(
+                key,
+                (tag_versions(tags), response),
+                settings.PAGE_CACHE_TIMEOUT,
+            )
+        return response
+
+    @staticmethod
+    def is_cacheable_request(request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        )
+
+    @staticmethod
+    def is_cacheable_response(request, response):
+        user = getattr(request, 'user', None)
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not (user is not None and user.is_authenticated)
+        )
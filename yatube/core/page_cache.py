@@ -0,0 +1,40 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+
+PAGE_KEY_PREFIX: str = 'page'
+TAG_KEY_PREFIX: str = 'page-tag'
+
+
+def page_key(request):
+    path = request.get_full_path().encode()
+    return f'{PAGE_KEY_PREFIX}:{request.method}:{md5(path).hexdigest()}'
+
+
+def tag_key(tag):
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def tag_versions(tags):
+    """Текущие версии тегов; отсутствующие получают новую версию."""
+    keys = {tag: tag_key(tag) for tag in tags}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        if key not in stored:
+            cache.add(key, uuid4().hex, timeout=None)
+            stored[key] = cache.get(key)
+        versions[tag] = stored[key]
+    return versions
+
+
+def purge_tags(*tags):
+    """Сбрасывает все закэшированные страницы с любым из тегов."""
+    cache.delete_many([tag_key(tag) for tag in tags])
+
+
+def tag_response(response, *tags):
+    """Помечает ответ тегами; только такие ответы попадают в кэш."""
+    response.cache_tags = set(tags)
+    return response
@@ -0,0 +1,24 @@
+CACHE_DATABASE = 'cache'
+CACHE_APP_LABEL = 'django_cache'
+
+
+class CacheRouter:
+    """
+    Таблица DatabaseCache живёт в отдельной базе: запись в кэш
+    не попадает в транзакцию запроса, не ждёт блокировки основной
+    базы и не считается в бюджет запросов страницы.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return CACHE_DATABASE
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, **hints):
+        if app_label == CACHE_APP_LABEL:
+            return db == CACHE_DATABASE
+        if db == CACHE_DATABASE:
+            return False
+        return None
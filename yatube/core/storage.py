@@ -0,0 +1,63 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+DIGEST_ALGORITHM: str = 'sha256'
+FANOUT_LENGTH: int = 2
+DEFAULT_FILE_MODE: int = 0o644
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файлы хранятся под хэшем содержимого: <каталог>/ab/abcdef….ext.
+    Загрузка пишется кусками во временный файл и одновременно
+    хэшируется; если файл с таким хэшем уже есть, копия не сохраняется
+    и возвращается имя существующего файла.
+
+    Один файл может принадлежать нескольким объектам, поэтому
+    удалять его можно, только когда ссылок на него не осталось.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Окончательное имя выбирает _save() по содержимому.
+        return name
+
+    def digest_name(self, name, digest):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(
+            directory, digest[:FANOUT_LENGTH], digest + extension
+        )
+
+    def _save(self, name, content):
+        directory = os.path.dirname(self.path(name))
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.new(DIGEST_ALGORITHM)
+        with tempfile.NamedTemporaryFile(
+            dir=directory, prefix='.upload-', delete=False
+        ) as temporary:
+            try:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temporary.write(chunk)
+            except BaseException:
+                os.unlink(temporary.name)
+                raise
+        name = self.digest_name(name, digest.hexdigest())
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.unlink(temporary.name)
+            return name
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Переименование атомарно: параллельная загрузка того же файла
+        # просто перезапишет его тем же содержимым.
+        os.replace(temporary.name, full_path)
+        # Временный файл создаётся с правами 0600.
+        os.chmod(full_path, self.file_permissions_mode or DEFAULT_FILE_MODE)
+        return name
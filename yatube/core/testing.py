@@ -0,0 +1,45 @@
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def isolated_caches(location):
+    """Настройка CACHES для тестов: файловый кэш в каталоге location."""
+    return {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }
+    }
+
+
+def testing_settings(cache_location):
+    """
+    Настройки для прогона тестов: превышение бюджета запросов — ошибка,
+    кэш — во временном каталоге. Общий кэш из настроек пережил бы
+    прогон, и версии фрагментов из прошлой тестовой базы совпали бы
+    с новыми.
+    """
+    return {
+        'QUERY_GUARD_RAISE': True,
+        'CACHES': isolated_caches(cache_location),
+    }
+
+
+class TestRunner(DiscoverRunner):
+    """Прогон тестов manage.py test с настройками testing_settings()."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp()
+        self.test_settings = override_settings(
+            **testing_settings(self.cache_dir)
+        )
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,42 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ..kvstore import SQLiteKVStore
+
+
+class SQLiteKVStoreTest(SimpleTestCase):
+    def setUp(self):
+        self.store = SQLiteKVStore()
+        self.store.clear()
+
+    def test_raw_operations(self):
+        self.store._set_raw('sorl||image||a', '1')
+        self.store._set_raw('sorl||image||b', '2')
+        self.store._set_raw('sorl||thumbnails||a', '[]')
+        self.store._set_raw('sorl||image||a', '3')
+        self.assertEqual(self.store._get_raw('sorl||image||a'), '3')
+        self.assertEqual(
+            self.store._find_keys_raw('sorl||image||'),
+            ['sorl||image||a', 'sorl||image||b'],
+        )
+        self.store._delete_raw('sorl||image||a', 'sorl||image||b')
+        self.assertIsNone(self.store._get_raw('sorl||image||a'))
+
+    def test_file_shared_between_stores(self):
+        """Файл в режиме WAL виден другим экземплярам (процессам)."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'kvstore.sqlite3')
+        with override_settings(THUMBNAIL_KVSTORE_PATH=path), \
+                mock.patch.object(SQLiteKVStore, '_in_memory',
+                                  return_value=False):
+            writer, reader = SQLiteKVStore(), SQLiteKVStore()
+            writer._set_raw('key', 'value')
+            self.assertEqual(reader._get_raw('key'), 'value')
+            mode, = reader.db.execute('PRAGMA journal_mode').fetchone()
+        self.assertEqual(mode, 'wal')
+        self.assertTrue(os.path.exists(path))
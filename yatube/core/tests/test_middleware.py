@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+
+from ..middleware import QueryBudgetExceeded, QueryCollector
+
+User = get_user_model()
+
+
+class QueryCountMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_query_headers(self):
+        """Ответ содержит число запросов, их время и число повторов."""
+        response = self.guest_client.get('/')
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertEqual(response['X-Query-Duplicates'], '0')
+        self.assertIn('X-Query-Time', response)
+
+    @override_settings(
+        QUERY_GUARD_RAISE=True, QUERY_BUDGETS={'posts:index': 0}
+    )
+    def test_budget_exceeded_raises(self):
+        """Превышение бюджета запросов вызывает исключение."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.guest_client.get('/')
+
+    @override_settings(
+        QUERY_GUARD_RAISE=False, QUERY_BUDGETS={'posts:index': 0}
+    )
+    def test_budget_exceeded_without_raise(self):
+        """Без QUERY_GUARD_RAISE бюджет только отражается в заголовках."""
+        response = self.guest_client.get('/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_collector_counts_repeated_shapes(self):
+        """Одинаковые по форме запросы считаются повторами."""
+        users = [
+            User.objects.create_user(username=f'user_{number}')
+            for number in range(3)
+        ]
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            for user in users:
+                User.objects.get(pk=user.pk)
+        self.assertEqual(collector.count, 3)
+        self.assertEqual(collector.duplicates, 2)
@@ -0,0 +1,21 @@
+from django.core.cache.backends.db import BaseDatabaseCache
+from django.db import router
+from django.test import SimpleTestCase
+
+from posts.models import Post
+
+from ..routers import CACHE_DATABASE
+
+
+class CacheRouterTest(SimpleTestCase):
+    def test_cache_table_in_own_database(self):
+        """Таблица кэша — только в базе кэша, модели — только в основной."""
+        cache_model = BaseDatabaseCache('django_cache', {}).cache_model_class
+        self.assertEqual(router.db_for_write(cache_model), CACHE_DATABASE)
+        self.assertEqual(router.db_for_read(cache_model), CACHE_DATABASE)
+        self.assertTrue(
+            router.allow_migrate_model(CACHE_DATABASE, cache_model)
+        )
+        self.assertFalse(router.allow_migrate_model('default', cache_model))
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate_model(CACHE_DATABASE, Post))
@@ -0,0 +1,40 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from ..storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=self.location)
+
+    def test_name_is_content_digest(self):
+        """Имя файла — хэш содержимого в подкаталоге по первым символам."""
+        name = self.storage.save('posts/Photo.JPG', ContentFile(b'image'))
+        digest = (
+            '6105d6cc76af400325e94d588ce511be'
+            '5bfdbb73b437dc51eca43917d7a43e3d'
+        )
+        self.assertEqual(name, f'posts/61/{digest}.jpg')
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), b'image')
+
+    def test_duplicate_upload_is_stored_once(self):
+        """Повторная загрузка того же содержимого не создаёт копию."""
+        first = self.storage.save('posts/a.gif', ContentFile(b'same'))
+        second = self.storage.save('posts/b.gif', ContentFile(b'same'))
+        other = self.storage.save('posts/c.gif', ContentFile(b'other'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        stored = [
+            filename
+            for _, _, filenames in os.walk(self.location)
+            for filename in filenames
+        ]
+        self.assertEqual(len(stored), 2)
@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'task', 'queue', 'status', 'run_at', 'attempts', 'locked_by'
+    )
+    list_filter = ('status', 'queue')
+    search_fields = ('task',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
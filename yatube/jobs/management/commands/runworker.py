@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker
+
+
+def run_worker(queues, burst):
+    Worker(queues).run(burst=burst)
+
+
+def in_memory_database():
+    return any(
+        connections[alias].vendor == 'sqlite'
+        and connections[alias].is_in_memory_db()
+        for alias in connections
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает обработчики фоновых задач из базы: несколько '
+        'процессов, каждый берёт задачи из очередей по одной.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOB_WORKERS,
+            help='Число процессов-обработчиков.',
+        )
+        parser.add_argument(
+            '--queue', dest='queues', action='append',
+            help='Очередь, из которой брать задачи; по умолчанию все.',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, когда готовых задач не останется.',
+        )
+
+    def handle(self, *args, processes, queues, burst, **options):
+        # Процессы не видят базу в памяти, поэтому работа идёт здесь же.
+        if processes <= 1 or in_memory_database():
+            run_worker(queues, burst)
+            return
+        # Соединения родителя не должны достаться процессам через fork.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(
+                target=run_worker, args=(queues, burst),
+                name=f'runworker-{number}',
+            )
+            for number in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(
+            f'Запущено обработчиков: {processes} '
+            f'({", ".join(str(worker.pid) for worker in workers)}).'
+        )
+
+        def forward(signum, frame):
+            for worker in workers:
+                if worker.is_alive():
+                    os.kill(worker.pid, signum)
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,56 @@
+from django.db import models
+from django.utils import timezone
+
+from core.models import CreatedModel
+
+
+class Job(CreatedModel):
+    """Фоновая задача: вызов функции-задачи с аргументами в JSON."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    queue = models.CharField(verbose_name='Очередь', max_length=50)
+    task = models.CharField(verbose_name='Задача', max_length=200)
+    payload = models.TextField(verbose_name='Аргументы', default='{}')
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED,
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Выполнить после', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток', default=0
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Наибольшее число попыток'
+    )
+    locked_by = models.CharField(
+        verbose_name='Обработчик', max_length=100, blank=True
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу', blank=True, null=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('run_at', 'id')
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'queue', 'run_at', 'id'),
+                name='job_status_queue_run_at_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.task} [{self.queue}]'
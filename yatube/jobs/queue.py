@@ -0,0 +1,181 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+DEFAULT_QUEUE: str = 'default'
+CLAIM_CANDIDATES: int = 10
+
+
+def task(queue=DEFAULT_QUEUE, max_attempts=None):
+    """
+    Объявляет функцию фоновой задачей. func.delay(*args, **kwargs)
+    ставит её вызов в очередь queue; аргументы должны сводиться к JSON.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.queue = queue
+        func.max_attempts = max_attempts
+
+        def delay(*args, **kwargs):
+            return enqueue(func, args, kwargs)
+
+        func.delay = delay
+        return func
+    return decorator
+
+
+def enqueue(func, args=(), kwargs=None, run_at=None):
+    """
+    Записывает задачу в базу. Внутри транзакции обработчик увидит
+    задачу только после коммита, а при откате её не будет вовсе.
+    """
+    return Job.objects.create(
+        queue=func.queue,
+        task=func.task_name,
+        payload=json.dumps(
+            {'args': list(args), 'kwargs': kwargs or {}},
+            cls=DjangoJSONEncoder,
+        ),
+        run_at=run_at or timezone.now(),
+        max_attempts=func.max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def queue_limit(queue):
+    return settings.JOB_QUEUES.get(queue, settings.JOB_QUEUES[DEFAULT_QUEUE])
+
+
+def running_in_queue():
+    return Coalesce(Subquery(
+        Job.objects.filter(
+            queue=OuterRef('queue'), status=Job.RUNNING
+        ).order_by().values('queue').annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def claim(worker, queues=None):
+    """
+    Берёт в работу первую готовую задачу из очередей queues.
+
+    Захват — один UPDATE … WHERE status = 'queued', который заодно
+    проверяет, что в очереди выполняется меньше задач, чем позволяет
+    JOB_QUEUES. Два обработчика не возьмут одну задачу и не превысят
+    лимит очереди и без SELECT … FOR UPDATE, которого нет в SQLite.
+    """
+    queues = list(queues or settings.JOB_QUEUES)
+    running = dict(
+        Job.objects.filter(status=Job.RUNNING, queue__in=queues).order_by(
+        ).values('queue').annotate(total=Count('pk')).values_list(
+            'queue', 'total'
+        )
+    )
+    open_queues = [
+        queue for queue in queues
+        if running.get(queue, 0) < queue_limit(queue)
+    ]
+    if not open_queues:
+        return None
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.QUEUED, queue__in=open_queues, run_at__lte=now
+    ).values_list('pk', 'queue')[:CLAIM_CANDIDATES]
+    for pk, queue in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).annotate(
+            running=running_in_queue()
+        ).filter(running__lt=queue_limit(queue)).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(seconds=min(
+        settings.JOB_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_DELAY,
+    ))
+
+
+def resolve(job):
+    func = import_string(job.task)
+    if getattr(func, 'task_name', None) != job.task:
+        raise ImportError(f'{job.task} не объявлена задачей.')
+    return func
+
+
+def owned(job):
+    """Строка задачи, пока её держит взявший её обработчик."""
+    return Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by
+    )
+
+
+def heartbeat(job):
+    """
+    Продлевает захват задачи: requeue_stale() не вернёт её в очередь,
+    пока обработчик жив. False — задачу уже забрали.
+    """
+    return bool(owned(job).update(locked_at=timezone.now()))
+
+
+def execute(job):
+    """
+    Выполняет взятую задачу. Выполненная задача удаляется; упавшая
+    возвращается в очередь с задержкой, а после max_attempts
+    остаётся в базе со статусом failed. Возвращает True при успехе.
+
+    Итог записывается, только если задача всё ещё за этим
+    обработчиком: если requeue_stale() успел отдать её другому,
+    строка принадлежит уже ему.
+    """
+    try:
+        payload = json.loads(job.payload)
+        resolve(job)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            owned(job).update(
+                status=Job.QUEUED,
+                run_at=timezone.now() + retry_delay(job.attempts),
+                locked_by='',
+                locked_at=None,
+                last_error=error,
+            )
+        else:
+            owned(job).update(
+                status=Job.FAILED, last_error=error
+            )
+        return False
+    owned(job).delete()
+    return True
+
+
+def requeue_stale():
+    """
+    Возвращает в очередь задачи, чей захват не продлевался дольше
+    JOB_TIMEOUT: живой обработчик продлевает его каждые
+    JOB_HEARTBEAT_INTERVAL секунд, значит, этот упал. Попытка при этом
+    засчитывается, и задача, исчерпавшая попытки, помечается failed.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=deadline)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error='Превышено время выполнения.'
+    )
+    return stale.update(status=Job.QUEUED, locked_by='', locked_at=None)
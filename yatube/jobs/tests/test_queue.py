@@ -0,0 +1,203 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Job
+from ..queue import (claim, execute, heartbeat, requeue_stale, retry_delay,
+                     task)
+from ..worker import Heartbeat, Worker
+
+CALLS = []
+
+
+@task()
+def record(value, extra=None):
+    CALLS.append((value, extra))
+
+
+@task(queue='email', max_attempts=2)
+def explode():
+    raise RuntimeError('Сломалось')
+
+
+def not_a_task():
+    CALLS.append('not_a_task')
+
+
+@override_settings(
+    JOB_QUEUES={'default': 2, 'email': 1},
+    JOB_RETRY_DELAY=10,
+    JOB_RETRY_MAX_DELAY=60,
+    JOB_TIMEOUT=60,
+)
+class JobQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_and_execute(self):
+        """Задача ставится в очередь и выполняется с аргументами."""
+        job = record.delay(1, extra={'a': 'б'})
+        self.assertEqual(job.task, 'jobs.tests.test_queue.record')
+        self.assertEqual(job.queue, 'default')
+        self.assertEqual(job.max_attempts, 5)
+
+        claimed = claim('worker')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Job.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(claim('worker'))
+
+        self.assertTrue(execute(claimed))
+        self.assertEqual(CALLS, [(1, {'a': 'б'})])
+        self.assertFalse(Job.objects.exists())
+
+    def test_claim_is_single_update(self):
+        """Захват — один UPDATE с проверкой состояния и лимита очереди."""
+        record.delay(1)
+        with CaptureQueriesContext(connection) as queries:
+            claim('worker')
+        updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status" = ', updates[0].split('WHERE', 1)[1])
+        self.assertIn('COUNT(', updates[0])
+
+    def test_future_jobs_wait(self):
+        record.delay(1)
+        Job.objects.update(run_at=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(claim('worker'))
+
+    def test_queue_concurrency_limit(self):
+        """Из очереди берётся не больше задач, чем в JOB_QUEUES."""
+        for number in range(3):
+            record.delay(number)
+        explode.delay()
+        claimed = [claim('worker', ['default']) for _ in range(3)]
+        self.assertIsNotNone(claimed[0])
+        self.assertIsNotNone(claimed[1])
+        self.assertIsNone(claimed[2])
+        self.assertEqual(claim('worker').queue, 'email')
+        self.assertIsNone(claim('worker'))
+
+        execute(claimed[0])
+        self.assertIsNotNone(claim('worker', ['default']))
+
+    def test_retry_with_backoff_then_fail(self):
+        """Упавшая задача повторяется с задержкой, затем помечается failed."""
+        job = explode.delay()
+        before = timezone.now()
+        self.assertFalse(execute(claim('worker')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=10))
+        self.assertIn('Сломалось', job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        self.assertFalse(execute(claim('worker')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(claim('worker'))
+
+    def test_retry_delay_doubles_up_to_maximum(self):
+        delays = [retry_delay(attempt).seconds for attempt in (1, 2, 3, 4)]
+        self.assertEqual(delays, [10, 20, 40, 60])
+
+    def test_only_declared_tasks_run(self):
+        """Функция без @task не выполняется, даже если её имя в базе."""
+        Job.objects.create(
+            queue='default', task='jobs.tests.test_queue.not_a_task',
+            max_attempts=1,
+        )
+        self.assertFalse(execute(claim('worker')))
+        self.assertEqual(CALLS, [])
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_stale_jobs_requeued(self):
+        """Задача упавшего обработчика возвращается в очередь."""
+        record.delay(1)
+        claim('worker')
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+    def test_heartbeat_keeps_job(self):
+        """Продлённая задача не считается зависшей."""
+        record.delay(1)
+        job = claim('worker')
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertTrue(heartbeat(job))
+        self.assertEqual(requeue_stale(), 0)
+        self.assertEqual(Job.objects.get().status, Job.RUNNING)
+
+    def test_requeued_job_belongs_to_new_worker(self):
+        """
+        Первый обработчик, у которого задачу забрали, не удаляет
+        и не перезаписывает строку второго.
+        """
+        record.delay(1)
+        first = claim('first')
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        requeue_stale()
+        second = claim('second')
+        self.assertFalse(heartbeat(first))
+
+        self.assertTrue(execute(first))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.locked_by, 'second')
+
+        Job.objects.update(task='jobs.tests.test_queue.explode')
+        first.task = second.task = 'jobs.tests.test_queue.explode'
+        self.assertFalse(execute(first))
+        self.assertEqual(Job.objects.get().last_error, '')
+        self.assertFalse(execute(second))
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0.01)
+    def test_worker_heartbeat_while_running(self):
+        """Пока задача выполняется, обработчик продлевает её захват."""
+        record.delay(1)
+        beats = threading.Event()
+
+        def beat(job):
+            beats.set()
+            return True
+
+        def wait(value, extra=None):
+            self.assertTrue(beats.wait(5))
+
+        with mock.patch('jobs.worker.heartbeat', beat), \
+                mock.patch('jobs.queue.resolve', return_value=wait):
+            self.assertTrue(Worker(name='worker').run_once())
+        self.assertFalse(Job.objects.exists())
+
+    def test_heartbeat_thread_stops_with_job(self):
+        record.delay(1)
+        job = claim('worker')
+        with mock.patch('jobs.worker.heartbeat') as beat:
+            with Heartbeat(job) as thread:
+                pass
+        self.assertFalse(thread.is_alive())
+        beat.assert_not_called()
+
+    def test_worker_burst(self):
+        """Обработчик в режиме burst выполняет все готовые задачи."""
+        record.delay(1)
+        record.delay(2)
+        Worker(name='worker').run(burst=True)
+        self.assertEqual(sorted(CALLS), [(1, None), (2, None)])
+
+    def test_runworker_command(self):
+        record.delay(1)
+        call_command('runworker', '--burst', stdout=StringIO())
+        self.assertEqual(CALLS, [(1, None)])
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,102 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+
+from .queue import claim, execute, heartbeat, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+
+class Heartbeat(threading.Thread):
+    """
+    Пока задача выполняется, раз в JOB_HEARTBEAT_INTERVAL секунд
+    продлевает её захват из отдельного потока со своим соединением.
+    """
+
+    def __init__(self, job):
+        super().__init__(name=f'heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.finished = threading.Event()
+
+    def run(self):
+        try:
+            while not self.finished.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    if not heartbeat(self.job):
+                        logger.warning(
+                            'Задачу %s забрал другой обработчик', self.job.pk
+                        )
+                        return
+                except DatabaseError:
+                    logger.exception(
+                        'Не удалось продлить задачу %s', self.job.pk
+                    )
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finished.set()
+        self.join()
+
+
+class Worker:
+    """
+    Обработчик очереди: берёт задачи по одной и выполняет их, пока
+    не получит SIGTERM/SIGINT. Без задач спит JOB_POLL_INTERVAL секунд.
+    """
+
+    def __init__(self, queues=None, name=None):
+        self.queues = queues
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run_once(self):
+        """Выполняет одну задачу; False — задач, готовых к работе, нет."""
+        if not connection.in_atomic_block:
+            # Как между запросами: закрыть соединение, если оно
+            # устарело или сломано.
+            close_old_connections()
+        job = claim(self.name, self.queues)
+        if job is None:
+            return False
+        logger.info('%s: задача %s (%s)', self.name, job.pk, job.task)
+        with Heartbeat(job):
+            succeeded = execute(job)
+        if not succeeded:
+            logger.warning('%s: задача %s упала', self.name, job.pk)
+        return True
+
+    def run(self, burst=False):
+        """
+        Работает до сигнала остановки; burst=True — пока в очереди
+        есть готовые задачи.
+        """
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            requeue_stale()
+            while not self.stopping:
+                if self.run_once():
+                    continue
+                if burst:
+                    break
+                requeue_stale()
+                time.sleep(settings.JOB_POLL_INTERVAL)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
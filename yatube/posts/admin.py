@@ -1,6 +1,10 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 
+from .autocomplete import autocomplete_index
+from .forms import PostForm
 from .models import Comment, Follow, Group, Post
+from .search import is_supported, match_expression, matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -9,13 +13,45 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
     list_editable = ('group',)
+    autocomplete_fields = ('group',)
+    # Поля задаются явно: у PostForm нет автора.
+    fields = ('text', 'author', 'group', 'image')
+    form = PostForm
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту идёт через FTS-индекс, а не LIKE '%…%'."""
+        if not search_term or not is_supported():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        if not match_expression(search_term):
+            return queryset.none(), False
+        matching = RawSQL(*matching_ids(search_term))
+        return queryset.filter(pk__in=matching), False
 
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'description',)
     search_fields = ('title',)
+    ordering = ('title',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Подсказки в полях автодополнения берутся из префиксного индекса."""
+        match = request.resolver_match
+        if not search_term or not (
+            match and match.url_name.endswith('_autocomplete')
+        ):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        pks = [
+            suggestion.pk for suggestion in autocomplete_index.search(
+                search_term, kind='group', limit=None
+            )
+        ]
+        return queryset.filter(pk__in=pks), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
@@ -0,0 +1,250 @@
+from bisect import bisect_left, insort
+from collections import namedtuple
+from threading import RLock
+from time import monotonic
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Group, User
+
+AUTOCOMPLETE_LIMIT: int = 10
+# как часто процесс сверяет свой индекс с журналом изменений в кэше
+AUTOCOMPLETE_CHECK_INTERVAL: float = 5
+AUTOCOMPLETE_SEQUENCE: str = 'autocomplete-sequence'
+AUTOCOMPLETE_CHANGE_PREFIX: str = 'autocomplete-change'
+# сколько изменений процесс догоняет по журналу, а не перечитывая
+# индекс целиком; столько же живёт запись журнала, секунды
+AUTOCOMPLETE_MAX_CHANGES: int = 100
+AUTOCOMPLETE_CHANGE_TIMEOUT: int = 60 * 60
+# запись журнала «изменилось всё»: после массовой загрузки
+EVERYTHING = ('*', None)
+
+Suggestion = namedtuple('Suggestion', 'key kind pk value label')
+
+
+def change_key(number):
+    return f'{AUTOCOMPLETE_CHANGE_PREFIX}:{number}'
+
+
+def current_sequence():
+    cache.add(AUTOCOMPLETE_SEQUENCE, 0, timeout=None)
+    return cache.get(AUTOCOMPLETE_SEQUENCE, 0)
+
+
+def next_sequence():
+    try:
+        return cache.incr(AUTOCOMPLETE_SEQUENCE)
+    except ValueError:
+        # Ключа нет: кэш очищен или ключ вытеснен.
+        cache.add(AUTOCOMPLETE_SEQUENCE, 0, timeout=None)
+        return cache.incr(AUTOCOMPLETE_SEQUENCE)
+
+
+class PrefixIndex:
+    """
+    Отсортированный массив ключей в памяти процесса. Поиск по префиксу —
+    bisect до первого подходящего ключа и проход, пока ключи совпадают
+    по префиксу, без запросов к БД.
+
+    Индекс строится из БД при первом обращении, дальше обновляется
+    на месте сигналами после коммита; clear() заставляет перечитать.
+    Индекс свой у каждого процесса, поэтому изменение ещё и пишется
+    в журнал в кэше (changed()): раз в AUTOCOMPLETE_CHECK_INTERVAL
+    секунд процесс применяет чужие изменения, перечитывая из БД только
+    изменённые объекты. Целиком индекс перечитывается, только если
+    журнал отстал больше чем на AUTOCOMPLETE_MAX_CHANGES записей
+    или потерян.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._entries = None
+        self._by_object = {}
+        self._sequence = None
+        self._checked_at = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries = None
+            self._by_object = {}
+            self._sequence = None
+
+    def changed(self, kind=None, pk=None):
+        """
+        Пишет изменение объекта в журнал для других процессов;
+        без аргументов — «изменилось всё».
+        """
+        number = next_sequence()
+        change = EVERYTHING if kind is None else (kind, pk)
+        if not cache.add(
+            change_key(number), change, timeout=AUTOCOMPLETE_CHANGE_TIMEOUT
+        ):
+            # incr не атомарен у части бэкендов: номер достался двум
+            # изменениям, и чужое потерялось бы. Все, включая этот
+            # процесс, перечитают индекс целиком.
+            cache.set(
+                change_key(number), EVERYTHING,
+                timeout=AUTOCOMPLETE_CHANGE_TIMEOUT,
+            )
+            return
+        with self._lock:
+            if self._sequence == number - 1:
+                # Своё изменение уже применено на месте.
+                self._sequence = number
+
+    @property
+    def is_loaded(self):
+        return self._entries is not None
+
+    def load(self):
+        with self._lock:
+            # Номер журнала читается до данных: изменение во время
+            # загрузки применится ещё раз при следующей проверке.
+            sequence = current_sequence()
+            entries, by_object = [], {}
+            users = User.objects.values_list('pk', 'username')
+            for pk, username in users.iterator():
+                suggestions = self.user_suggestions(pk, username)
+                entries.extend(suggestions)
+                by_object['user', pk] = suggestions
+            groups = Group.objects.values_list('pk', 'slug', 'title')
+            for pk, slug, title in groups.iterator():
+                suggestions = self.group_suggestions(pk, slug, title)
+                entries.extend(suggestions)
+                by_object['group', pk] = suggestions
+            entries.sort()
+            # Поиск читает _entries без блокировки: новый массив
+            # подменяет старый целиком, уже отсортированным.
+            self._entries, self._by_object = entries, by_object
+            self._sequence = sequence
+            self._checked_at = monotonic()
+            return entries
+
+    def refresh(self):
+        """
+        Загружает индекс или догоняет журнал; возвращает массив
+        ключей. Вызывается из search() не чаще раза
+        в AUTOCOMPLETE_CHECK_INTERVAL секунд.
+        """
+        with self._lock:
+            if self.is_loaded:
+                self._checked_at = monotonic()
+                if self._catch_up():
+                    return self._entries
+            return self.load()
+
+    def _catch_up(self):
+        """Применяет изменения из журнала; False — журнала не хватает."""
+        latest = cache.get(AUTOCOMPLETE_SEQUENCE)
+        if latest is None:
+            return False
+        if latest == self._sequence:
+            return True
+        if not 0 < latest - self._sequence <= AUTOCOMPLETE_MAX_CHANGES:
+            return False
+        keys = [
+            change_key(number)
+            for number in range(self._sequence + 1, latest + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys) or EVERYTHING in changes.values():
+            return False
+        objects = set(changes.values())
+        user_ids = {pk for kind, pk in objects if kind == 'user'}
+        group_ids = {pk for kind, pk in objects if kind == 'group'}
+        for pk, username in User.objects.filter(
+            pk__in=user_ids
+        ).values_list('pk', 'username'):
+            user_ids.discard(pk)
+            self._update(self.user_suggestions(pk, username), 'user', pk)
+        for pk, slug, title in Group.objects.filter(
+            pk__in=group_ids
+        ).values_list('pk', 'slug', 'title'):
+            group_ids.discard(pk)
+            self._update(
+                self.group_suggestions(pk, slug, title), 'group', pk
+            )
+        for kind, deleted in (('user', user_ids), ('group', group_ids)):
+            for pk in deleted:
+                self._remove(kind, pk)
+        self._sequence = latest
+        return True
+
+    @staticmethod
+    def user_suggestions(pk, username):
+        return [Suggestion(username.casefold(), 'user', pk, username,
+                           username)]
+
+    @staticmethod
+    def group_suggestions(pk, slug, title):
+        return [
+            Suggestion(key.casefold(), 'group', pk, slug, title)
+            for key in dict.fromkeys((slug, title))
+        ]
+
+    def _update(self, suggestions, kind, pk):
+        self._remove(kind, pk)
+        for suggestion in suggestions:
+            insort(self._entries, suggestion)
+        if suggestions:
+            self._by_object[kind, pk] = suggestions
+
+    def _remove(self, kind, pk):
+        for suggestion in self._by_object.pop((kind, pk), ()):
+            position = bisect_left(self._entries, suggestion)
+            if (
+                position < len(self._entries)
+                and self._entries[position] == suggestion
+            ):
+                del self._entries[position]
+
+    def update(self, suggestions, kind, pk):
+        """Заменяет ключи объекта; до первой загрузки ничего не делает."""
+        with self._lock:
+            if self.is_loaded:
+                self._update(suggestions, kind, pk)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            if self.is_loaded:
+                self._remove(kind, pk)
+
+    def search(self, prefix, kind=None, limit=AUTOCOMPLETE_LIMIT):
+        """
+        Подсказки, чей ключ начинается с prefix, по алфавиту. Объект,
+        подошедший по нескольким ключам, попадает в ответ один раз.
+        limit=None — все подсказки.
+        """
+        prefix = prefix.casefold()
+        if not prefix:
+            return []
+        entries = self._entries
+        if entries is None or (
+            monotonic() - self._checked_at >= AUTOCOMPLETE_CHECK_INTERVAL
+        ):
+            entries = self.refresh()
+        results, seen = [], set()
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and (
+            limit is None or len(results) < limit
+        ):
+            suggestion = entries[position]
+            if not suggestion.key.startswith(prefix):
+                break
+            position += 1
+            if kind is not None and suggestion.kind != kind:
+                continue
+            if (suggestion.kind, suggestion.pk) not in seen:
+                seen.add((suggestion.kind, suggestion.pk))
+                results.append(suggestion)
+        return results
+
+
+autocomplete_index = PrefixIndex()
+
+
+def suggestion_url(suggestion):
+    if suggestion.kind == 'user':
+        return reverse('posts:profile', args=(suggestion.value,))
+    return reverse('posts:group_list', args=(suggestion.value,))
@@ -0,0 +1,139 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.template.loader import get_template
+
+VERSION_KEY_PREFIX: str = 'feed-version'
+FRAGMENT_KEY_PREFIX: str = 'post-fragment'
+FRAGMENT_TIMEOUT: int = 60 * 60 * 24
+
+
+def version_key(name):
+    return f'{VERSION_KEY_PREFIX}:{name}'
+
+
+def cache_version(*names):
+    """
+    Общая версия фрагментов ленты, зависящих от names.
+    Меняется, как только меняется хотя бы одна из частей.
+    """
+    keys = [version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Версии случайные, а не счётчики: после вытеснения ключа
+            # новая версия не совпадёт со старыми фрагментами.
+            cache.add(key, uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_versions(*names):
+    """Сбрасывает фрагменты, которые зависят от names."""
+    cache.set_many(
+        {version_key(name): uuid4().hex for name in names}, timeout=None
+    )
+
+
+def index_version():
+    return cache_version('posts')
+
+
+def group_version(group):
+    return cache_version(f'group:{group.pk}', 'authors')
+
+
+def profile_version(author):
+    return cache_version(f'profile:{author.pk}', 'groups')
+
+
+def viewer_version(request):
+    """
+    Версия данных, которые видит только этот пользователь. Ключ сессии
+    меняется при каждом входе вместе с CSRF-токеном: иначе после
+    повторного входа браузер взял бы из кэша форму со старым токеном.
+    """
+    if not request.user.is_authenticated:
+        return None
+    return (
+        request.user.pk,
+        request.session.session_key,
+        cache_version(f'following:{request.user.pk}'),
+    )
+
+
+def page_etag(request, *versions):
+    """
+    Валидатор страницы: адрес с параметрами, зритель и версии данных.
+    Считается без запросов к БД, до рендеринга шаблона.
+    """
+    parts = [request.get_full_path(), viewer_version(request), *versions]
+    return md5(repr(parts).encode()).hexdigest()
+
+
+def feed_etag(request, **kwargs):
+    # Версия 'posts' меняется при любом изменении постов, групп
+    # и авторов, поэтому подходит для всех лент.
+    return page_etag(request, index_version())
+
+
+def post_etag(request, post_id):
+    return page_etag(request, cache_version(f'comments:{post_id}', 'posts'))
+
+
+def post_tags(post):
+    """Теги полностраничного кэша для страницы, на которой есть пост."""
+    tags = {f'post:{post.pk}', f'user:{post.author_id}'}
+    if post.group_id:
+        tags.add(f'group:{post.group_id}')
+    return tags
+
+
+def page_tags(posts):
+    return set().union(*(post_tags(post) for post in posts))
+
+
+def fragment_key(post, show_group_link=False, show_author_link=False):
+    """
+    Ключ фрагмента includes/post.html. Собирается из всего, что
+    попадает в разметку, поэтому отдельная инвалидация не нужна.
+    """
+    parts = [
+        post.pk, post.updated.isoformat(), post.image.name,
+        bool(show_group_link), bool(show_author_link),
+    ]
+    if show_author_link:
+        parts += [post.author.username, post.author.get_full_name()]
+    if show_group_link and post.group_id:
+        parts.append(post.group.slug)
+    digest = md5(repr(parts).encode()).hexdigest()
+    return f'{FRAGMENT_KEY_PREFIX}:{post.pk}:{digest}'
+
+
+def render_post_fragments(posts, show_group_link=False,
+                          show_author_link=False):
+    """
+    Разметка постов ленты. Готовые фрагменты берутся из кэша одним
+    get_many, рендерятся только отсутствующие.
+    """
+    posts = list(posts)
+    keys = [
+        fragment_key(post, show_group_link, show_author_link)
+        for post in posts
+    ]
+    cached = cache.get_many(keys)
+    template = get_template('includes/post.html')
+    rendered = {}
+    fragments = []
+    for key, post in zip(keys, posts):
+        if key not in cached:
+            rendered[key] = template.render({
+                'post': post,
+                'show_group_link': show_group_link,
+                'show_author_link': show_author_link,
+            })
+        fragments.append(cached.get(key, rendered.get(key)))
+    if rendered:
+        cache.set_many(rendered, FRAGMENT_TIMEOUT)
+    return fragments
@@ -0,0 +1,132 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, StoredImage, User, UserStats
+
+RECONCILE_BATCH_SIZE: int = 500
+
+
+def bump_user(user_id, **deltas):
+    """
+    Сдвигает счётчики пользователя на deltas одним UPDATE.
+    Счётчик, который ушёл бы в минус, не трогается: такой дрейф
+    исправляет reconcile_counters.
+    """
+    return UserStats.objects.filter(
+        user_id=user_id,
+        **{
+            f'{name}__gte': -delta
+            for name, delta in deltas.items() if delta < 0
+        },
+    ).update(
+        **{name: F(name) + delta for name, delta in deltas.items()}
+    )
+
+
+def bump_user_or_create(user_id, **deltas):
+    """
+    Как bump_user, но при отсутствии строки со счётчиками
+    создаёт её по фактическим данным.
+    """
+    if not bump_user(user_id, **deltas):
+        UserStats.objects.update_or_create(
+            user_id=user_id, defaults=actual_user_counters(user_id)
+        )
+
+
+def bump_post(post_id, delta):
+    Post.objects.filter(pk=post_id, comments_count__gte=-delta).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def retain_image(name):
+    """Ещё один пост ссылается на файл картинки name."""
+    if StoredImage.objects.filter(name=name).update(
+        references=F('references') + 1
+    ):
+        return
+    _, created = StoredImage.objects.get_or_create(
+        name=name, defaults={'references': 1}
+    )
+    if not created:
+        StoredImage.objects.filter(name=name).update(
+            references=F('references') + 1
+        )
+
+
+def release_image(name):
+    """
+    Пост больше не ссылается на файл name. Возвращает True, если
+    ссылок не осталось и файл можно удалять.
+    """
+    StoredImage.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1
+    )
+    deleted, _ = StoredImage.objects.filter(name=name, references=0).delete()
+    return bool(deleted)
+
+
+def actual_user_counters(user_id):
+    return {
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def _total(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def reconcile_counters():
+    """
+    Пересчитывает все счётчики по фактическим данным.
+    Возвращает число исправленных строк счётчиков пользователей и постов.
+    """
+    UserStats.objects.bulk_create(
+        (
+            UserStats(user_id=pk)
+            for pk in User.objects.filter(
+                stats__isnull=True
+            ).values_list('pk', flat=True)
+        ),
+        batch_size=RECONCILE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    drifted_users = UserStats.objects.annotate(
+        actual_posts=_total(Post.objects, 'author'),
+        actual_followers=_total(Follow.objects, 'author'),
+        actual_following=_total(Follow.objects, 'user'),
+    ).exclude(
+        posts_count=F('actual_posts'),
+        followers_count=F('actual_followers'),
+        following_count=F('actual_following'),
+    )
+    users_fixed = []
+    for stats in drifted_users.iterator():
+        stats.posts_count = stats.actual_posts
+        stats.followers_count = stats.actual_followers
+        stats.following_count = stats.actual_following
+        users_fixed.append(stats)
+    UserStats.objects.bulk_update(
+        users_fixed,
+        ('posts_count', 'followers_count', 'following_count'),
+        batch_size=RECONCILE_BATCH_SIZE,
+    )
+
+    drifted_posts = Post.objects.annotate(
+        actual_comments=_total(Comment.objects, 'post'),
+    ).exclude(comments_count=F('actual_comments')).only('pk')
+    posts_fixed = []
+    for post in drifted_posts.iterator():
+        post.comments_count = post.actual_comments
+        posts_fixed.append(post)
+    Post.objects.bulk_update(
+        posts_fixed, ('comments_count',), batch_size=RECONCILE_BATCH_SIZE
+    )
+    return len(users_fixed), len(posts_fixed)
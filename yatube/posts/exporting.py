@@ -0,0 +1,189 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+from io import StringIO
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Follow, Group, Post, User
+
+EXPORT_CHUNK_SIZE: int = 2000
+STATE_FILE: str = 'export-state.json'
+
+# Поля выгрузки совпадают с полями import_posts.
+TABLES = {
+    'users': (User, {
+        'id': 'pk',
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email',
+        'date_joined': 'date_joined',
+    }),
+    'groups': (Group, {
+        'id': 'pk',
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+    }),
+    'posts': (Post, {
+        'id': 'pk',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'image': 'image',
+    }),
+    'comments': (Comment, {
+        'id': 'pk',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }),
+    'follows': (Follow, {
+        'id': 'pk',
+        'user': 'user__username',
+        'author': 'author__username',
+    }),
+}
+
+# Каждая пачка сжимается отдельно: склеенные потоки gzip, bzip2 и xz
+# читаются как один файл, а дописывать можно с любой границы пачки.
+COMPRESSORS = {
+    'none': ('', lambda data: data),
+    'gzip': ('.gz', gzip.compress),
+    'bz2': ('.bz2', bz2.compress),
+    'xz': ('.xz', lzma.compress),
+}
+
+
+def format_jsonl(columns, rows):
+    return ''.join(
+        json.dumps(
+            dict(zip(columns, row)), cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+        for row in rows
+    )
+
+
+def format_csv(columns, rows):
+    buffer = StringIO()
+    csv.writer(buffer).writerows(
+        ['' if value is None else value for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+def csv_header(columns):
+    return format_csv(columns, [columns])
+
+
+FORMATTERS = {
+    'jsonl': (format_jsonl, None),
+    'csv': (format_csv, csv_header),
+}
+
+
+class Exporter:
+    """
+    Потоковая выгрузка таблиц в каталог, по файлу на таблицу.
+
+    Строки читаются QuerySet.iterator() по возрастанию pk, только
+    нужные столбцы; в памяти — одна пачка. После каждой пачки
+    в export-state.json записываются последний pk и размер файла,
+    поэтому прерванную выгрузку можно продолжить (resume=True):
+    файл обрезается до последней целой пачки, чтение идёт с pk > last.
+    """
+
+    def __init__(self, directory, format_='jsonl', compress='none',
+                 chunk_size=EXPORT_CHUNK_SIZE, resume=False):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.state_path = os.path.join(directory, STATE_FILE)
+        if resume and os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as state:
+                self.state = json.load(state)
+        else:
+            self.state = {
+                'format': format_, 'compress': compress, 'tables': {}
+            }
+
+    @property
+    def format(self):
+        return self.state['format']
+
+    @property
+    def compress(self):
+        return self.state['compress']
+
+    def path(self, table):
+        extension, _ = COMPRESSORS[self.compress]
+        return os.path.join(
+            self.directory, f'{table}.{self.format}{extension}'
+        )
+
+    def save_state(self):
+        temporary = self.state_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as state:
+            json.dump(self.state, state)
+            state.flush()
+            os.fsync(state.fileno())
+        os.replace(temporary, self.state_path)
+
+    @staticmethod
+    def write(output, data):
+        output.write(data)
+        output.flush()
+        os.fsync(output.fileno())
+
+    def run(self, tables=TABLES):
+        """Выгружает таблицы; после каждой пачки отдаёт (таблица, строк)."""
+        os.makedirs(self.directory, exist_ok=True)
+        for table in tables:
+            progress = self.state['tables'].setdefault(
+                table, {'last_pk': None, 'offset': 0, 'rows': 0,
+                        'done': False}
+            )
+            if not progress['done']:
+                yield from self.export_table(table, progress)
+
+    def export_table(self, table, progress):
+        model, fields = TABLES[table]
+        columns = list(fields)
+        queryset = model.objects.order_by('pk')
+        if progress['last_pk'] is not None:
+            queryset = queryset.filter(pk__gt=progress['last_pk'])
+        rows = queryset.values_list(*fields.values()).iterator(
+            chunk_size=self.chunk_size
+        )
+        _, compressor = COMPRESSORS[self.compress]
+        formatter, header = FORMATTERS[self.format]
+        with open(self.path(table), 'ab') as output:
+            # Хвост после последней сохранённой пачки — от прерванной
+            # записи: он выгрузится заново.
+            output.truncate(progress['offset'])
+            if progress['offset'] == 0 and header is not None:
+                self.write(output, compressor(header(columns).encode()))
+                progress['offset'] = output.tell()
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                text = formatter(columns, chunk)
+                self.write(output, compressor(text.encode()))
+                progress.update(
+                    last_pk=chunk[-1][0],
+                    offset=output.tell(),
+                    rows=progress['rows'] + len(chunk),
+                )
+                self.save_state()
+                yield table, progress['rows']
+        progress['done'] = True
+        self.save_state()
+        yield table, progress['rows']
@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+
+from .models import Follow, InboxEntry, Post, UserStats
+
+INBOX_BATCH_SIZE: int = 500
+# ключ курсора ленты подписок: аннотации follow_sources()
+FOLLOW_FEED_KEY = ('feed_date', 'feed_post')
+
+
+def followers_count(author_id):
+    """Число подписчиков из счётчика UserStats, без COUNT(*) по Follow."""
+    return UserStats.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+
+
+def is_pulled(author_id):
+    """
+    Посты авторов с большим числом подписчиков не раскладываются
+    по входящим, а подмешиваются в ленту при чтении.
+    """
+    return followers_count(author_id) > settings.FEED_FANOUT_THRESHOLD
+
+
+def fan_out_post(post):
+    """Доставляет новый пост во входящие всех подписчиков автора."""
+    if is_pulled(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    InboxEntry.objects.bulk_create(
+        (
+            InboxEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers.iterator()
+        ),
+        batch_size=INBOX_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_inbox(follow):
+    """Заполняет входящие новой подписки уже опубликованными постами."""
+    if is_pulled(follow.author_id):
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id
+    ).values_list('pk', 'pub_date')
+    InboxEntry.objects.bulk_create(
+        (
+            InboxEntry(user_id=follow.user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts.iterator()
+        ),
+        batch_size=INBOX_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fill_inboxes(author_ids):
+    """
+    Раскладывает по входящим подписчиков все посты авторов author_ids
+    одним INSERT … SELECT, без строк в памяти. Для массовой загрузки,
+    где backfill_inbox() по каждой подписке слишком медленный.
+    """
+    author_ids = list(author_ids)
+    if not author_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(author_ids))
+    inbox = InboxEntry._meta.db_table
+    follows = Follow._meta.db_table
+    stats = UserStats._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {inbox} (user_id, post_id, pub_date)
+            SELECT follow.user_id, post.id, post.pub_date
+            FROM {follows} follow
+            JOIN {Post._meta.db_table} post
+                ON post.author_id = follow.author_id
+            WHERE follow.author_id IN ({placeholders})
+            AND follow.author_id NOT IN (
+                SELECT user_id FROM {stats}
+                WHERE user_id IN ({placeholders})
+                AND followers_count > %s
+            )
+            ON CONFLICT DO NOTHING
+            """,
+            author_ids + author_ids + [settings.FEED_FANOUT_THRESHOLD],
+        )
+
+
+def prune_inbox(follow):
+    """Убирает из входящих посты автора, от которого отписались."""
+    InboxEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.author_id
+    ).delete()
+
+
+def crossed_threshold_down(before, after):
+    """
+    Число подписчиков перешло порог сверху вниз: посты автора снова
+    раздаются при записи, и входящие подписчиков пора догнать.
+    Сравниваются значения до и после удаления, а не одно «после»:
+    удаление пачкой может перешагнуть порог, не остановившись на нём.
+    """
+    threshold = settings.FEED_FANOUT_THRESHOLD
+    return before > threshold >= after
+
+
+def index_feed():
+    return Post.objects.select_related('author', 'group')
+
+
+def group_feed(group):
+    return group.posts.select_related('author', 'group')
+
+
+def profile_feed(author):
+    return author.posts.select_related('author', 'group')
+
+
+def comment_list(post):
+    return post.comments.select_related('author')
+
+
+def pulled_authors(user):
+    """
+    Авторы из подписок пользователя, чьи посты читаются при запросе.
+    Число подписчиков берётся из счётчиков, а не считается заново.
+    """
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gt=(
+                settings.FEED_FANOUT_THRESHOLD
+            ),
+        ).values_list('author', flat=True)
+    )
+
+
+def follow_sources(user):
+    """
+    Выборки ленты подписок для MergedCursorPaginator: входящие
+    пользователя и по выборке на каждого «тяжёлого» автора. Каждая
+    упорядочена по своему индексу, и страница читает из неё не больше
+    per_page + 1 записей.
+
+    Ключ — аннотации FOLLOW_FEED_KEY: во входящих это столбцы самой
+    записи входящих, и фильтр курсора не добавляет второй JOIN, как
+    добавил бы новый filter() по inbox_entries__pub_date.
+    """
+    posts = Post.objects.select_related('author', 'group')
+    inbox = posts.filter(inbox_entries__user=user).annotate(
+        feed_date=F('inbox_entries__pub_date'),
+        feed_post=F('inbox_entries__post'),
+    )
+    return [inbox] + [
+        posts.filter(author_id=author_id).annotate(
+            feed_date=F('pub_date'), feed_post=F('pk'),
+        )
+        for author_id in pulled_authors(user)
+    ]
@@ -1,6 +1,8 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
 from .models import Comment, Post
+from .uploads import normalize_image
 
 
 class PostForm(forms.ModelForm):
@@ -8,6 +10,24 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def clean_image(self):
+        """
+        Новая картинка проходит normalize_image(), а её размеры и формат
+        записываются в пост, чтобы шаблонам не открывать файл.
+        """
+        image = self.cleaned_data.get('image')
+        if image is False:
+            self.set_image_info(None, None, '')
+        elif isinstance(image, UploadedFile):
+            image, info = normalize_image(image)
+            self.set_image_info(info['width'], info['height'], info['format'])
+        return image
+
+    def set_image_info(self, width, height, format_):
+        self.instance.image_width = width
+        self.instance.image_height = height
+        self.instance.image_format = format_
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
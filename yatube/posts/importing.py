@@ -0,0 +1,375 @@
+import csv
+import json
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.page_cache import purge_tags
+
+from .autocomplete import autocomplete_index
+from .caching import bump_versions
+from .counters import reconcile_counters
+from .feeds import fill_inboxes
+from .models import Follow, Group, Post, User
+
+IMPORT_BATCH_SIZE: int = 1000
+LOOKUP_CHUNK_SIZE: int = 500
+RECORD_TYPES = ('group', 'post', 'follow')
+
+
+class InvalidRecord(ValueError):
+    """Запись нельзя импортировать: нет полей или ссылки не найдены."""
+
+
+def read_jsonl(lines):
+    """
+    Отдаёт пары (номер строки, запись). Вместо строки, которая
+    не разбирается, — InvalidRecord: импорт её пропустит.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            record = InvalidRecord(f'Неверный JSON: {error.msg}.')
+        yield number, record
+
+
+def read_csv(lines):
+    """То же для CSV; номер — строка файла, где запись начинается."""
+    reader = csv.DictReader(lines)
+    try:
+        reader.fieldnames
+    except csv.Error as error:
+        yield 1, InvalidRecord(f'Неверный заголовок CSV: {error}.')
+        return
+    while True:
+        number = reader.line_num + 1
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            record = InvalidRecord(f'Неверная строка CSV: {error}.')
+        yield number, record
+
+
+READERS = {
+    'jsonl': read_jsonl,
+    'csv': read_csv,
+}
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def chunks(items, size=LOOKUP_CHUNK_SIZE):
+    # Ограничение SQLite на число параметров в IN (...).
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def last_pk(model):
+    return model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+
+
+def bulk_insert(model, objects, **kwargs):
+    """
+    bulk_create, возвращающий pk действительно вставленных строк
+    по порядку вставки (без отброшенных ignore_conflicts).
+
+    Вызывается в транзакции: в SQLite, пока она пишет, другие
+    соединения строк не вставляют, а pk растут в порядке вставки,
+    поэтому новые строки — это pk больше прежнего максимума.
+    """
+    after = last_pk(model)
+    model.objects.bulk_create(objects, **kwargs)
+    return list(model.objects.filter(pk__gt=after).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+
+
+def auto_date_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+def insert_with_dates(model, objects):
+    """
+    Вставляет объекты с их собственными датами. bulk_create заменяет
+    поля auto_now/auto_now_add текущим временем, а выключать флаги
+    нельзя — поле модели общее для всего процесса. Поэтому даты
+    записываются следом одним bulk_update по выданным pk.
+    """
+    fields = auto_date_fields(model)
+    dates = [
+        [getattr(obj, field.attname) for field in fields] for obj in objects
+    ]
+    pks = bulk_insert(model, objects)
+    for obj, pk, values in zip(objects, pks, dates):
+        obj.pk = pk
+        for field, value in zip(fields, values):
+            setattr(obj, field.attname, value)
+    if fields and objects:
+        model.objects.bulk_update(objects, [field.name for field in fields])
+    return pks
+
+
+def text(record, field):
+    value = record.get(field)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise InvalidRecord(f'Поле {field} должно быть строкой.')
+    return value.strip()
+
+
+def parse_date(value):
+    if not value:
+        return timezone.now()
+    try:
+        date = parse_datetime(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise InvalidRecord(f'Неверная дата: {value}.')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def required(record, *fields):
+    values = [text(record, field) for field in fields]
+    missing = [field for field, value in zip(fields, values) if not value]
+    if missing:
+        raise InvalidRecord(f'Нет полей: {", ".join(missing)}.')
+    return values
+
+
+def names(records, *fields):
+    """Строковые значения полей: для поиска пользователей и групп."""
+    for _, record in records:
+        for field in fields:
+            value = record.get(field)
+            if isinstance(value, str) and value.strip():
+                yield value.strip()
+
+
+class Importer:
+    """
+    Пакетный импорт групп, постов и подписок.
+
+    Записи идут пакетами по batch_size, каждый пакет — в своей
+    транзакции и несколькими bulk_create. Авторы и группы ищутся
+    в словарях в памяти, которые пополняются одним запросом на пакет;
+    недостающие пользователи создаются без пароля.
+
+    Сигналы при bulk_create не срабатывают, поэтому их работа —
+    счётчики, входящие подписок, сброс кэшей — выполняется один раз
+    в finish(). Её нужно вызвать и после ошибки посреди импорта:
+    пакеты до неё уже в базе.
+
+    Записи — пары (номер строки, запись) от READERS; неразобранная
+    или неверная запись пропускается и попадает в errors.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, record_type=None):
+        self.batch_size = batch_size
+        self.record_type = record_type
+        self.users = {}
+        self.groups = {}
+        self.stats = Counter()
+        self.errors = []
+        self.authors = set()
+        self.followers = set()
+        self.touched_groups = set()
+        self.unusable_password = make_password(None)
+        self.username_length = User._meta.get_field('username').max_length
+
+    def run(self, records):
+        """Импортирует записи; после каждого пакета отдаёт self.stats."""
+        for batch in batches(records, self.batch_size):
+            with transaction.atomic():
+                self.import_batch(batch)
+            yield self.stats
+
+    def import_batch(self, batch):
+        by_type = defaultdict(list)
+        for number, record in batch:
+            if isinstance(record, InvalidRecord):
+                self.reject(number, str(record))
+                continue
+            if not isinstance(record, dict):
+                self.reject(number, 'Запись должна быть объектом.')
+                continue
+            record_type = self.record_type or record.get('type')
+            if record_type not in RECORD_TYPES:
+                self.reject(number, f'Неизвестный тип: {record_type}.')
+            else:
+                by_type[record_type].append((number, record))
+        self.stats['read'] += len(batch)
+        self.import_groups(by_type['group'])
+        self.lookup_groups(names(by_type['post'], 'group'))
+        self.resolve_users(
+            names(by_type['post'] + by_type['follow'], 'author', 'user')
+        )
+        self.import_posts(by_type['post'])
+        self.import_follows(by_type['follow'])
+
+    def reject(self, number, reason):
+        self.stats['skipped'] += 1
+        self.errors.append((number, reason))
+
+    def import_groups(self, records):
+        groups = {}
+        for number, record in records:
+            try:
+                slug, title = required(record, 'slug', 'title')
+            except InvalidRecord as error:
+                self.reject(number, str(error))
+                continue
+            if slug in self.groups or slug in groups:
+                continue
+            try:
+                description = text(record, 'description')
+            except InvalidRecord as error:
+                self.reject(number, str(error))
+                continue
+            groups[slug] = Group(
+                slug=slug, title=title, description=description,
+            )
+        self.lookup_groups(groups)
+        new = [
+            group for slug, group in groups.items()
+            if slug not in self.groups
+        ]
+        inserted = bulk_insert(Group, new, ignore_conflicts=True)
+        self.lookup_groups(group.slug for group in new)
+        self.stats['groups'] += len(inserted)
+
+    def lookup_groups(self, slugs):
+        for chunk in chunks(set(slugs) - self.groups.keys()):
+            self.groups.update(
+                Group.objects.filter(slug__in=chunk).values_list('slug', 'pk')
+            )
+
+    def resolve_users(self, usernames):
+        missing = {
+            username for username in usernames
+            if len(username) <= self.username_length
+        } - self.users.keys()
+        for chunk in chunks(missing):
+            self.users.update(
+                User.objects.filter(
+                    username__in=chunk
+                ).values_list('username', 'pk')
+            )
+        new = [
+            User(username=username, password=self.unusable_password)
+            for username in sorted(missing - self.users.keys())
+        ]
+        inserted = bulk_insert(User, new, ignore_conflicts=True)
+        for chunk in chunks(user.username for user in new):
+            self.users.update(
+                User.objects.filter(
+                    username__in=chunk
+                ).values_list('username', 'pk')
+            )
+        self.stats['users'] += len(inserted)
+
+    def user_id(self, username):
+        if username not in self.users:
+            raise InvalidRecord(f'Неверное имя пользователя: {username}.')
+        return self.users[username]
+
+    def import_posts(self, records):
+        posts = []
+        for number, record in records:
+            try:
+                author, body = required(record, 'author', 'text')
+                group = text(record, 'group')
+                group_id = None
+                if group:
+                    group_id = self.groups.get(group)
+                    if group_id is None:
+                        raise InvalidRecord(f'Нет группы {group}.')
+                pub_date = parse_date(text(record, 'pub_date'))
+                author_id = self.user_id(author)
+            except InvalidRecord as error:
+                self.reject(number, str(error))
+                continue
+            posts.append(Post(
+                author_id=author_id, group_id=group_id, text=body,
+                pub_date=pub_date, updated=pub_date,
+            ))
+            self.authors.add(author_id)
+            self.touched_groups.add(group_id)
+        self.stats['posts'] += len(insert_with_dates(Post, posts))
+
+    def import_follows(self, records):
+        follows = []
+        for number, record in records:
+            try:
+                user, author = required(record, 'user', 'author')
+                if user == author:
+                    raise InvalidRecord('Нельзя подписаться на себя.')
+                user_id, author_id = self.user_id(user), self.user_id(author)
+            except InvalidRecord as error:
+                self.reject(number, str(error))
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+            self.authors.add(author_id)
+            self.followers.add(user_id)
+        self.stats['follows'] += len(
+            bulk_insert(Follow, follows, ignore_conflicts=True)
+        )
+
+    def finish(self):
+        finish_bulk_load(self.authors, self.followers, self.touched_groups)
+
+
+def finish_bulk_load(author_ids, follower_ids=(), group_ids=()):
+    """
+    Работа сигналов после массовой вставки через bulk_create:
+    счётчики пересчитываются целиком, входящие подписок дополняются
+    постами авторов author_ids, кэши страниц и фрагментов затронутых
+    пользователей и групп сбрасываются один раз.
+    FTS-индекс поиска обновляют триггеры SQLite при вставке.
+    """
+    with transaction.atomic():
+        reconcile_counters()
+    for chunk in chunks(author_ids):
+        with transaction.atomic():
+            fill_inboxes(chunk)
+    group_ids = set(group_ids) - {None}
+    user_ids = set(author_ids) | set(follower_ids)
+    bump_versions(
+        'posts', 'groups', 'authors',
+        *(f'profile:{pk}' for pk in user_ids),
+        *(f'group:{pk}' for pk in group_ids),
+        *(f'following:{pk}' for pk in follower_ids),
+    )
+    purge_tags(
+        'feed:index',
+        *(f'user:{pk}' for pk in user_ids),
+        *(f'group:{pk}' for pk in group_ids),
+    )
+    autocomplete_index.clear()
+    autocomplete_index.changed()
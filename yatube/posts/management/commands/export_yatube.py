@@ -0,0 +1,60 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exporting import (COMPRESSORS, EXPORT_CHUNK_SIZE, FORMATTERS,
+                             TABLES, Exporter)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, группы, посты, комментарии и подписки '
+        'в JSONL или CSV, по файлу на таблицу, с постоянным расходом '
+        'памяти. Прерванную выгрузку продолжает --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', help='Каталог для файлов выгрузки.',
+        )
+        parser.add_argument(
+            '--format', choices=sorted(FORMATTERS), default='jsonl',
+        )
+        parser.add_argument(
+            '--compress', choices=sorted(COMPRESSORS), default='none',
+            help='Сжатие файлов на лету.',
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=list(TABLES), default=list(TABLES),
+            help='Таблицы для выгрузки; по умолчанию все.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Строк в одной пачке чтения и записи.',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную выгрузку в тот же каталог '
+                 'с теми же форматом и сжатием.',
+        )
+
+    def handle(self, *args, directory, tables, chunk_size, resume,
+               **options):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        exporter = Exporter(
+            directory, options['format'], options['compress'], chunk_size,
+            resume,
+        )
+        started = perf_counter()
+        totals = {}
+        for table, rows in exporter.run(tables):
+            totals[table] = rows
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{table}: {rows}')
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            'Выгружено: '
+            + ', '.join(f'{table} — {rows}' for table, rows in totals.items())
+            + f' за {elapsed:.1f} с.'
+        ))
@@ -0,0 +1,134 @@
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from posts.feeds import (FOLLOW_FEED_KEY, backfill_inbox, fan_out_post,
+                         follow_sources)
+from posts.models import Follow, InboxEntry, Post, User, UserStats
+from posts.paginators import MergedCursorPaginator
+from posts.views import POSTS_PER_PAGE
+
+DEFAULT_FOLLOWERS = (10, 100, 1000, 5000, 20000)
+AUTHOR_POSTS: int = 50
+# Сколько раз ленты подписчиков читаются на один пост автора. Раздача
+# при записи платится один раз на пост, подмешивание — на каждое
+# чтение, поэтому сравнивать надо запись с надбавкой чтения,
+# умноженной на это отношение.
+READS_PER_POST: int = 20
+
+
+def timed(func, repeat, setup=None):
+    """Медиана времени выполнения func в миллисекундах."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = perf_counter()
+        func()
+        samples.append((perf_counter() - started) * 1000)
+    return median(samples)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку раздачи поста по входящим (запись) '
+        'с надбавкой подмешивания автора в ленту (чтение с подмешиванием '
+        'минус чтение из входящих), умноженной на число чтений на пост, '
+        'и показывает, при каком числе подписчиков они пересекаются. '
+        'Все данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--followers', type=int, nargs='+', default=DEFAULT_FOLLOWERS,
+            help='Числа подписчиков автора, которые нужно проверить.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз повторять каждый замер.',
+        )
+        parser.add_argument(
+            '--reads-per-post', type=int, default=READS_PER_POST,
+            help='Чтений ленты подписок на один пост автора.',
+        )
+
+    def handle(self, *args, **options):
+        rows = []
+        with transaction.atomic():
+            for count in options['followers']:
+                rows.append(self.measure(count, options['repeat']))
+            transaction.set_rollback(True)
+
+        reads = options['reads_per_post']
+        self.stdout.write(
+            f'{"подписчиков":>12} {"запись, мс":>12} '
+            f'{"входящие, мс":>14} {"подмешивание, мс":>18} '
+            f'{f"надбавка × {reads}, мс":>20}'
+        )
+        crossover = None
+        for count, push_ms, inbox_ms, pull_ms in rows:
+            pull_cost = max(pull_ms - inbox_ms, 0) * reads
+            self.stdout.write(
+                f'{count:>12} {push_ms:>12.2f} {inbox_ms:>14.2f} '
+                f'{pull_ms:>18.2f} {pull_cost:>20.2f}'
+            )
+            if crossover is None and push_ms > pull_cost:
+                crossover = count
+        threshold = settings.FEED_FANOUT_THRESHOLD
+        if crossover is None:
+            self.stdout.write('Раздача при записи дешевле во всём диапазоне.')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'При {reads} чтениях на пост запись дороже чтения '
+                f'начиная с {crossover} подписчиков.'
+            ))
+        self.stdout.write(f'FEED_FANOUT_THRESHOLD = {threshold}.')
+
+    def measure(self, count, repeat):
+        """
+        Запись — раздача одного поста по входящим всех подписчиков.
+        Чтение — первая страница ленты подписчика: когда посты автора
+        уже во входящих и когда автор подмешивается при запросе.
+        """
+        prefix = f'feed_benchmark_{count}'
+        author = User.objects.create(username=f'{prefix}_author')
+        User.objects.bulk_create(
+            User(username=f'{prefix}_{number}') for number in range(count)
+        )
+        followers = User.objects.filter(username__startswith=f'{prefix}_')
+        Follow.objects.bulk_create(
+            Follow(user_id=pk, author=author)
+            for pk in followers.exclude(pk=author.pk).values_list(
+                'pk', flat=True)
+        )
+        UserStats.objects.filter(user=author).update(followers_count=count)
+        Post.objects.bulk_create(
+            Post(text=f'{prefix} #{number}', author=author)
+            for number in range(AUTHOR_POSTS)
+        )
+        follow = Follow.objects.filter(author=author).first()
+        reader = follow.user
+
+        def read_page():
+            return list(MergedCursorPaginator(
+                follow_sources(reader), POSTS_PER_PAGE, FOLLOW_FEED_KEY
+            ).get_page(None))
+
+        with override_settings(FEED_FANOUT_THRESHOLD=count):
+            post = Post.objects.create(text=prefix, author=author)
+            push_ms = timed(
+                lambda: fan_out_post(post),
+                repeat,
+                setup=InboxEntry.objects.filter(post=post).delete,
+            )
+            backfill_inbox(follow)
+            inbox_ms = timed(read_page, repeat)
+            InboxEntry.objects.filter(user=reader).delete()
+
+        with override_settings(FEED_FANOUT_THRESHOLD=count - 1):
+            pull_ms = timed(read_page, repeat)
+        return count, push_ms, inbox_ms, pull_ms
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import generate_post_thumbnail
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт недостающие миниатюры изображений постов: после '
+        'переноса хранилища метаданных или добавления новых размеров.'
+    )
+
+    def handle(self, *args, **options):
+        names = Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct()
+        done = failed = 0
+        for name in names.iterator():
+            try:
+                generate_post_thumbnail(name)
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+            else:
+                done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {done}, с ошибками: {failed}.'
+        ))
@@ -0,0 +1,89 @@
+import os
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import (IMPORT_BATCH_SIZE, READERS, RECORD_TYPES,
+                             Importer)
+
+SHOWN_ERRORS: int = 20
+
+
+def input_format(path, requested):
+    if requested:
+        return requested
+    return 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'jsonl'
+
+
+def rate(count, started):
+    return count / max(perf_counter() - started, 1e-6)
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует группы, посты и подписки из JSONL или CSV. '
+        'Тип записи — поле type или --type; группы должны идти раньше '
+        'постов, которые на них ссылаются. Поля: group — slug, title, '
+        'description; post — author, text, group, pub_date; '
+        'follow — user, author. Недостающие пользователи создаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+', metavar='path',
+            help='Файлы для импорта; - — стандартный ввод.',
+        )
+        parser.add_argument(
+            '--format', choices=sorted(READERS),
+            help='Формат файлов; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--type', dest='record_type', choices=RECORD_TYPES,
+            help='Тип всех записей, если в них нет поля type.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Записей в одном bulk_create и одной транзакции.',
+        )
+
+    def records(self, paths, requested_format):
+        for path in paths:
+            read = READERS[input_format(path, requested_format)]
+            if path == '-':
+                yield from read(sys.stdin)
+                continue
+            try:
+                with open(path, encoding='utf-8', newline='') as lines:
+                    yield from read(lines)
+            except (OSError, UnicodeDecodeError) as error:
+                raise CommandError(f'{path}: {error}')
+
+    def handle(self, *args, paths, batch_size, record_type, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        importer = Importer(batch_size, record_type)
+        started = perf_counter()
+        records = self.records(paths, options['format'])
+        try:
+            for stats in importer.run(records):
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'Прочитано {stats["read"]}: '
+                        f'{rate(stats["read"], started):.0f} записей/с.'
+                    )
+        finally:
+            # Уже записанные пакеты должны получить счётчики и ленты,
+            # даже если файл оборвался ошибкой.
+            importer.finish()
+
+        for number, reason in importer.errors[:SHOWN_ERRORS]:
+            self.stderr.write(f'Строка {number}: {reason}')
+        stats = importer.stats
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: групп — {stats["groups"]}, '
+            f'постов — {stats["posts"]}, подписок — {stats["follows"]}, '
+            f'новых пользователей — {stats["users"]}; '
+            f'пропущено — {stats["skipped"]}. '
+            f'{rate(stats["read"], started):.0f} записей/с.'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.page_cache import purge_tags
+from posts.caching import bump_versions
+from posts.search import is_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс постов (SQLite FTS5) '
+        'и восстанавливает триггеры, которые его обновляют.'
+    )
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        with transaction.atomic():
+            indexed = rebuild_search_index()
+        # Выдача поиска могла измениться: сбрасываем её кэш и ETag.
+        bump_versions('posts')
+        purge_tags('feed:index')
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {indexed}.'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счётчики постов, комментариев '
+        'и подписок по фактическим данным и исправляет расхождения.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            users_fixed, posts_fixed = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков: пользователей — {users_fixed}, '
+            f'постов — {posts_fixed}.'
+        ))
@@ -0,0 +1,76 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.seeding import SEED_BATCH_SIZE, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные для нагрузочных проверок: '
+        'степенной граф подписок, посты с перекосом по авторам '
+        'и группам, всплески комментариев и картинки. Одинаковое '
+        'зерно даёт одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--follows', type=float, default=20,
+            help='Среднее число подписок пользователя.',
+        )
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--images', type=int, default=10,
+            help='Число разных картинок для постов.',
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.1,
+            help='Доля постов с картинкой.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределены даты постов.',
+        )
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и адресов групп.',
+        )
+        parser.add_argument(
+            '--password', default='password',
+            help='Пароль всех созданных пользователей.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        seeder = Seeder(
+            options['seed'], options['prefix'], options['batch_size'],
+            options['password'], options['days'],
+        )
+        stages = seeder.run(
+            options['users'], options['groups'], options['posts'],
+            options['follows'], options['comments'], options['images'],
+            options['image_ratio'],
+        )
+        started = stage_started = perf_counter()
+        try:
+            for stage, rows in stages:
+                elapsed = perf_counter() - stage_started
+                rate = f' ({rows / max(elapsed, 1e-6):.0f} строк/с)'
+                self.stdout.write(
+                    f'{stage}: {rows} за {elapsed:.1f} с'
+                    f'{rate if rows else ""}.'
+                )
+                stage_started = perf_counter()
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {perf_counter() - started:.1f} с.'
+        ))
@@ -0,0 +1,73 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def total(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Один INSERT ... SELECT на строки счётчиков и по одному UPDATE
+    с коррелированным подзапросом на счётчик: каждый подзапрос считает
+    по индексу своего внешнего ключа, без соединения всех связей сразу.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        'INSERT INTO {stats} (user_id, posts_count, followers_count, '
+        'following_count) SELECT {pk}, 0, 0, 0 FROM {users}'.format(
+            stats=quote(UserStats._meta.db_table),
+            pk=quote(User._meta.pk.column),
+            users=quote(User._meta.db_table),
+        )
+    )
+    UserStats.objects.update(posts_count=total(Post.objects, 'author'))
+    UserStats.objects.update(
+        followers_count=total(Follow.objects, 'author')
+    )
+    UserStats.objects.update(following_count=total(Follow.objects, 'user'))
+    Post.objects.update(comments_count=total(Comment.objects, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0015_auto_20261017_0447'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Число подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Число подписок')),
+            ],
+            options={
+                'verbose_name': 'Счётчики пользователя',
+                'verbose_name_plural': 'Счётчики пользователей',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
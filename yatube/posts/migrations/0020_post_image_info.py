@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-17 05:17
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import migrations, models
+from PIL import Image
+
+
+def read_image_info(apps, schema_editor):
+    """Размеры и формат уже загруженных картинок — по заголовку файла."""
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.exclude(image='').only('image')
+    for post in posts.iterator():
+        try:
+            with post.image.open('rb') as file_, Image.open(file_) as image:
+                width, height = image.size
+                format_ = image.format or ''
+        except (OSError, ValueError, SuspiciousFileOperation):
+            continue
+        Post.objects.filter(pk=post.pk).update(
+            image_width=width, image_height=height, image_format=format_
+        )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_stored_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_format',
+            field=models.CharField(blank=True, editable=False, max_length=10, verbose_name='Формат картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота картинки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина картинки'),
+        ),
+        migrations.RunPython(read_image_info, migrations.RunPython.noop),
+    ]
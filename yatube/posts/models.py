@@ -2,9 +2,11 @@ from django.contrib.auth import get_user_model
 from django.db import models
 
 from core.models import CreatedModel
+from core.storage import ContentAddressedStorage
 
 User = get_user_model()
 POST_STR_LENGTH: int = 15
+post_image_storage = ContentAddressedStorage()
 
 
 class Group(models.Model):
@@ -46,13 +48,54 @@ class Post(CreatedModel):
     image = models.ImageField(
         verbose_name='Картинка',
         upload_to='posts/',
+        storage=post_image_storage,
         blank=True
     )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина картинки',
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота картинки',
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    image_format = models.CharField(
+        verbose_name='Формат картинки',
+        max_length=10,
+        blank=True,
+        editable=False,
+    )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Число комментариев',
+        default=0,
+        editable=False,
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'), name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:POST_STR_LENGTH]
@@ -80,6 +123,12 @@ class Comment(CreatedModel):
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', '-pub_date', '-id'),
+                name='comment_post_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:POST_STR_LENGTH]
@@ -102,6 +151,93 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+        )
 
     def __str__(self):
         return self.author
+
+
+class UserStats(models.Model):
+    """Счётчики пользователя, которые поддерживаются при записи."""
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов', default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Число подписчиков', default=0
+    )
+    following_count = models.PositiveIntegerField(
+        verbose_name='Число подписок', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class InboxEntry(models.Model):
+    """Материализованная лента подписок: пост, доставленный подписчику."""
+    user = models.ForeignKey(
+        User,
+        related_name='inbox',
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name='inbox_entries',
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+    )
+    pub_date = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи ленты подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_inbox_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='inbox_user_pub_date_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} ← {self.post}'
+
+
+class StoredImage(models.Model):
+    """Файл картинки в хранилище по содержимому и число ссылок на него."""
+    name = models.CharField(
+        verbose_name='Файл',
+        max_length=100,
+        primary_key=True,
+    )
+    references = models.PositiveIntegerField(
+        verbose_name='Число постов', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self):
+        return self.name
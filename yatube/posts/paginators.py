@@ -0,0 +1,259 @@
+import base64
+import binascii
+import heapq
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_NEXT: str = 'n'
+CURSOR_PREVIOUS: str = 'p'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+CURSOR_KEY = ('pub_date', 'pk')
+
+
+def encode_cursor(direction, pub_date, pk, number):
+    """
+    Упаковывает ключ (pub_date, pk) и номер страницы, на которую
+    ведёт курсор, в непрозрачный токен.
+    """
+    microseconds = (pub_date - EPOCH) // timedelta(microseconds=1)
+    raw = f'{direction}|{number}|{microseconds}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен. Для битого токена возвращает None."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, number, microseconds, pk = raw.decode().split('|')
+        number = int(number)
+        pub_date = EPOCH + timedelta(microseconds=int(microseconds))
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError):
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or number < 1:
+        return None
+    return direction, number, pub_date, pk
+
+
+def row_key(paginator, row):
+    date_field, pk_field = paginator.key
+    return getattr(row, date_field), getattr(row, pk_field)
+
+
+def next_cursor(page):
+    return encode_cursor(
+        CURSOR_NEXT, *row_key(page.paginator, page[-1]), page.number + 1
+    )
+
+
+def previous_cursor(page):
+    return encode_cursor(
+        CURSOR_PREVIOUS, *row_key(page.paginator, page[0]), page.number - 1
+    )
+
+
+class CursorPage(Page):
+    """
+    Страница keyset-пагинации: в адресе вместо номера — курсор.
+
+    Номер страницы (сколько страниц пройдено от начала ленты)
+    переносится в курсоре, поэтому number, start_index() и
+    next_page_number() работают как у Page. has_next() и has_previous()
+    записи не считают; num_pages и end_index() последней страницы
+    выполняют COUNT(*), только если к ним обратились.
+    """
+
+    def __init__(self, object_list, number, cursor, paginator,
+                 has_next, has_previous):
+        super().__init__(object_list, number, paginator)
+        self.cursor = cursor
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage {self.number} {self.cursor or "first"}>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        return next_cursor(self) if self._has_next else None
+
+    @property
+    def previous_cursor(self):
+        return previous_cursor(self) if self._has_previous else None
+
+    def next_page_number(self):
+        if not self._has_next:
+            raise EmptyPage('Это последняя страница.')
+        return self.number + 1
+
+    def previous_page_number(self):
+        if not self._has_previous:
+            raise EmptyPage('Это первая страница.')
+        return self.number - 1
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинация по ключу (pub_date, pk) от новых к старым.
+    Не выполняет OFFSET: каждая страница — это диапазонный запрос
+    от ключа последней (или первой) записи. COUNT(*) — только при
+    обращении к count, num_pages или page_range.
+
+    key — имена поля даты и целочисленного поля ключа, если лента
+    упорядочена не по колонкам самой модели, а, например,
+    по аннотациям со столбцами присоединённой таблицы.
+    """
+
+    def __init__(self, object_list, per_page, key=CURSOR_KEY):
+        self.key = key
+        date_field, pk_field = key
+        super().__init__(
+            object_list.order_by(f'-{date_field}', f'-{pk_field}'), per_page
+        )
+
+    def _keyset(self, pub_date, pk, lookup):
+        date_field, pk_field = self.key
+        return Q(**{f'{date_field}__{lookup}': pub_date}) | Q(**{
+            date_field: pub_date, f'{pk_field}__{lookup}': pk,
+        })
+
+    def _slice(self, queryset, limit, lookup=None, pub_date=None, pk=None):
+        """
+        Не больше limit записей queryset: lookup 'lt' — после ключа
+        от новых к старым, 'gt' — перед ним от старых к новым,
+        None — с начала ленты.
+        """
+        if lookup is not None:
+            queryset = queryset.filter(self._keyset(pub_date, pk, lookup))
+        if lookup == 'gt':
+            queryset = queryset.reverse()
+        return list(queryset[:limit])
+
+    def _rows(self, limit, lookup=None, pub_date=None, pk=None):
+        return self._slice(self.object_list, limit, lookup, pub_date, pk)
+
+    def get_page(self, cursor):
+        """Возвращает страницу по токену; битый токен — первая страница."""
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self._first_page()
+        direction, number, pub_date, pk = decoded
+        if direction == CURSOR_NEXT:
+            return self._page_after(cursor, number, pub_date, pk)
+        return self._page_before(cursor, number, pub_date, pk)
+
+    def page(self, cursor):
+        return self.get_page(cursor)
+
+    def _page(self, rows, number, cursor, has_next, has_previous):
+        return CursorPage(rows, number, cursor, self, has_next, has_previous)
+
+    def _first_page(self):
+        rows = self._rows(self.per_page + 1)
+        return self._page(
+            rows[:self.per_page], 1, '',
+            has_next=len(rows) > self.per_page,
+            has_previous=False,
+        )
+
+    def _page_after(self, cursor, number, pub_date, pk):
+        rows = self._rows(self.per_page + 1, 'lt', pub_date, pk)
+        return self._page(
+            rows[:self.per_page], max(number, 2), cursor,
+            has_next=len(rows) > self.per_page,
+            has_previous=True,
+        )
+
+    def _page_before(self, cursor, number, pub_date, pk):
+        rows = self._rows(self.per_page + 1, 'gt', pub_date, pk)
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        if not has_previous:
+            # Дошли до начала ленты: отдаём полноценную первую страницу,
+            # чтобы она не оказалась короче остальных.
+            return self._first_page()
+        return self._page(
+            rows, max(number, 2), cursor,
+            has_next=True,
+            has_previous=True,
+        )
+
+
+class PageCursorPaginator(CursorPaginator):
+    """
+    Та же выборка по ключу, но страницы — обычные Page с атрибутами
+    cursor, next_cursor и previous_cursor: для кода, которому нужен
+    именно Page. has_next() и has_previous() берутся из выборки, а не
+    из num_pages, поэтому COUNT(*) не выполняется, а удалённые после
+    начала листания посты не обрывают ленту раньше времени.
+    """
+
+    def _page(self, rows, number, cursor, has_next, has_previous):
+        page = Page(rows, number, self)
+        page.cursor = cursor
+        page.has_next = lambda: has_next
+        page.has_previous = lambda: has_previous
+        page.next_cursor = next_cursor(page) if has_next else None
+        page.previous_cursor = (
+            previous_cursor(page) if has_previous else None
+        )
+        return page
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """
+    Курсорная пагинация по объединению нескольких выборок с общим
+    ключом. Из каждой берётся не больше per_page + 1 записей по её
+    собственному индексу, и они сливаются, а повторы (запись в двух
+    выборках) отбрасываются. Один запрос с OR вместо этого прочёл бы
+    все выборки целиком и сортировал их на каждой странице.
+    """
+
+    def __init__(self, sources, per_page, key=CURSOR_KEY):
+        date_field, pk_field = key
+        self.sources = [
+            source.order_by(f'-{date_field}', f'-{pk_field}')
+            for source in sources
+        ]
+        super().__init__(self.sources[0], per_page, key)
+
+    @cached_property
+    def count(self):
+        first, *others = (
+            source.order_by().values('pk') for source in self.sources
+        )
+        return first.union(*others).count()
+
+    def _rows(self, limit, lookup=None, pub_date=None, pk=None):
+        merged = heapq.merge(
+            *(
+                self._slice(source, limit, lookup, pub_date, pk)
+                for source in self.sources
+            ),
+            key=partial(row_key, self),
+            reverse=lookup != 'gt',
+        )
+        rows, seen = [], set()
+        for row in merged:
+            if row.pk in seen:
+                continue
+            seen.add(row.pk)
+            rows.append(row)
+            if len(rows) == limit:
+                break
+        return rows
+
+
+class PageMergedCursorPaginator(MergedCursorPaginator, PageCursorPaginator):
+    """MergedCursorPaginator со страницами Page, как PageCursorPaginator."""
@@ -0,0 +1,215 @@
+import base64
+import binascii
+import struct
+import unicodedata
+
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import OperationalError, connection
+from django.utils.functional import cached_property
+
+from .models import Post
+
+FTS_TABLE: str = 'posts_post_fts'
+SEARCH_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON posts_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+)
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def ensure_search_triggers(using=connection):
+    """
+    Триггеры, которые держат FTS-индекс в согласии с posts_post.
+    SQLite теряет их, когда миграция пересоздаёт таблицу постов,
+    поэтому они восстанавливаются после каждого migrate.
+    """
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            (FTS_TABLE,),
+        )
+        if cursor.fetchone() is None:
+            return
+        for statement in SEARCH_TRIGGERS:
+            cursor.execute(statement)
+
+
+def rebuild_search_index(using=connection):
+    """Заполняет FTS-индекс заново по posts_post."""
+    ensure_search_triggers(using)
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+        )
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def printable(term):
+    """
+    Слово без управляющих символов: FTS5 обрывает строку на NUL
+    и отвечает ошибкой «unterminated string».
+    """
+    return ''.join(
+        char for char in term if unicodedata.category(char)[0] != 'C'
+    )
+
+
+def match_expression(query):
+    """
+    Запрос пользователя в синтаксисе FTS5: каждое слово ищется как
+    отдельная фраза, поэтому кавычки и операторы в запросе безопасны.
+    """
+    terms = [
+        '"{}"'.format(term.replace('"', '""'))
+        for term in map(printable, query.split()) if term
+    ]
+    return ' '.join(terms)
+
+
+def encode_rank_cursor(rank, pk, number):
+    """Ключ (rank, rowid) и номер страницы, на которую ведёт курсор."""
+    raw = struct.pack('>dqI', rank, pk, number)
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_rank_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        rank, pk, number = struct.unpack('>dqI', raw)
+    except (binascii.Error, struct.error, ValueError):
+        return None
+    if number < 2:
+        return None
+    return rank, pk, number
+
+
+def matching_ids(query):
+    """SQL подзапроса с id постов, подходящих под query."""
+    return (
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match_expression(query),),
+    )
+
+
+class SearchPage(Page):
+    """
+    Страница результатов поиска: листается только вперёд. Номер
+    переносится в курсоре, число результатов считается по требованию.
+    """
+
+    def __init__(self, object_list, number, cursor, paginator, next_cursor):
+        super().__init__(object_list, number, paginator)
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.previous_cursor = None
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        if not self.has_next():
+            raise EmptyPage('Это последняя страница.')
+        return self.number + 1
+
+
+class SearchPaginator(Paginator):
+    """
+    Результаты по убыванию релевантности (bm25) с keyset-пагинацией
+    по ключу (rank, rowid): страница — один диапазонный запрос к FTS
+    и один запрос постов, без COUNT(*) и OFFSET. count — отдельный
+    COUNT(*) по FTS, только если к нему обратились.
+    """
+
+    def __init__(self, query, per_page):
+        super().__init__(
+            Post.objects.select_related('author', 'group'), per_page
+        )
+        self.query = query
+
+    @cached_property
+    def count(self):
+        expression = match_expression(self.query)
+        if not expression:
+            return 0
+        try:
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(
+                    f'SELECT count(*) FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s',
+                    [expression],
+                )
+                return db_cursor.fetchone()[0]
+        except OperationalError:
+            return 0
+
+    def get_page(self, cursor):
+        decoded = decode_rank_cursor(cursor) if cursor else None
+        expression = match_expression(self.query)
+        if not expression:
+            return SearchPage([], 1, '', self, None)
+        sql = (
+            f'SELECT rowid, rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s'
+        )
+        params = [expression]
+        if decoded is not None:
+            rank, pk, number = decoded
+            sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+            params += [rank, rank, pk]
+        else:
+            cursor, number = '', 1
+        sql += ' ORDER BY rank, rowid LIMIT %s'
+        params.append(self.per_page + 1)
+        try:
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(sql, params)
+                rows = db_cursor.fetchall()
+        except OperationalError:
+            # Запрос, который FTS5 не разобрал, ничего не находит.
+            return SearchPage([], 1, '', self, None)
+
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            last_pk, last_rank = rows[-1]
+            next_cursor = encode_rank_cursor(last_rank, last_pk, number + 1)
+        posts = self.object_list.in_bulk([pk for pk, _ in rows])
+        return SearchPage(
+            [posts[pk] for pk, _ in rows if pk in posts],
+            number, cursor, self, next_cursor,
+        )
+
+    def page(self, cursor):
+        return self.get_page(cursor)
@@ -0,0 +1,294 @@
+import random
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from .importing import (auto_date_fields, finish_bulk_load,
+                        insert_with_dates, last_pk)
+from .models import (Comment, Follow, Group, Post, StoredImage, User,
+                     post_image_storage)
+from .thumbnails import generate_post_thumbnail
+
+SEED_BATCH_SIZE: int = 2000
+# Конец интервала дат: от него, а не от текущего времени, данные
+# одинаковы при каждом запуске с тем же зерном.
+SEED_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# Показатели степенных распределений: популярность авторов,
+# плодовитость авторов, популярность групп и обсуждаемость постов.
+FOLLOWED_EXPONENT: float = 1.1
+POSTING_EXPONENT: float = 1.0
+GROUP_EXPONENT: float = 1.2
+COMMENTED_EXPONENT: float = 1.2
+# Число подписок пользователя — Парето с этим показателем.
+FOLLOWING_SHAPE: float = 1.5
+GROUP_SHARE: float = 0.6
+# Комментарии приходят всплеском: в среднем через час после поста.
+COMMENT_DELAY: float = 60 * 60
+IMAGE_SIZE = (1200, 800)
+WORDS = (
+    'лето кот река город утро дорога книга море дом друг снег ветер '
+    'поезд музыка окно свет ночь сад чай лес небо день вечер мост '
+    'улица песня дождь поле остров звезда письмо зима весна осень '
+    'гора озеро тропа парк кофе сон лодка берег огонь камень'
+).split()
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса рангов 1..count для random.choices."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Seeder:
+    """
+    Синтетические данные для нагрузочных проверок: степенной граф
+    подписок, посты с перекосом по авторам и группам, всплески
+    комментариев под популярными постами и картинки.
+
+    Всё определяется зерном seed. Строки вставляются bulk_create
+    пачками по batch_size, у всех пользователей один заранее
+    посчитанный хэш пароля; работа сигналов — один раз в конце.
+    """
+
+    def __init__(self, seed=0, prefix='seed', batch_size=SEED_BATCH_SIZE,
+                 password='password', days=365):
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.password_hash = make_password(password, salt=f'{prefix}{seed}')
+        self.start = SEED_EPOCH - timedelta(days=days)
+        self.span = days * 24 * 60 * 60
+        self.user_ids = array('q')
+        self.group_ids = array('q')
+        self.post_ids = array('q')
+        self.post_times = array('d')
+        self.images = []
+        self.followers = set()
+        self.authors = set()
+
+    def run(self, users, groups, posts, follows, comments, images=0,
+            image_ratio=0.0):
+        """Создаёт данные по этапам; после каждого отдаёт (этап, строк)."""
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise ValueError(
+                f'Пользователи с префиксом {self.prefix} уже есть.'
+            )
+        yield 'users', self.create_users(users)
+        yield 'groups', self.create_groups(groups)
+        yield 'follows', self.create_follows(follows)
+        yield 'images', self.create_images(images)
+        yield 'posts', self.create_posts(posts, image_ratio)
+        yield 'comments', self.create_comments(comments)
+        finish_bulk_load(self.authors, self.followers, self.group_ids)
+        yield 'finish', 0
+
+    def insert(self, model, objects):
+        """bulk_create пачками, каждая — в своей транзакции."""
+        batch, total = [], 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                total += self.flush(model, batch)
+                batch = []
+        return total + self.flush(model, batch)
+
+    @staticmethod
+    def flush(model, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            if auto_date_fields(model):
+                insert_with_dates(model, batch)
+            else:
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
+
+    def new_ids(self, queryset, after):
+        return array('q', queryset.filter(pk__gt=after).order_by(
+            'pk'
+        ).values_list('pk', flat=True).iterator())
+
+    def moment(self):
+        return self.start + timedelta(seconds=self.random.random() * self.span)
+
+    def text(self, mean_words=20):
+        length = max(1, min(300, int(self.random.lognormvariate(
+            0, 0.8
+        ) * mean_words)))
+        return ' '.join(self.random.choices(WORDS, k=length)).capitalize()
+
+    def create_users(self, count):
+        after = last_pk(User)
+        total = self.insert(User, (
+            User(
+                username=f'{self.prefix}{number:07d}',
+                password=self.password_hash,
+                date_joined=self.moment(),
+            )
+            for number in range(count)
+        ))
+        self.user_ids = self.new_ids(
+            User.objects.filter(username__startswith=self.prefix), after
+        )
+        return total
+
+    def create_groups(self, count):
+        after = last_pk(Group)
+        total = self.insert(Group, (
+            Group(
+                slug=f'{self.prefix}-{number}',
+                title=f'{self.random.choice(WORDS).capitalize()} {number}',
+                description=self.text(),
+            )
+            for number in range(count)
+        ))
+        self.group_ids = self.new_ids(
+            Group.objects.filter(slug__startswith=f'{self.prefix}-'), after
+        )
+        return total
+
+    def ranked(self, ids):
+        """ids в случайном порядке: ранг популярности не равен pk."""
+        ranked = list(ids)
+        self.random.shuffle(ranked)
+        return ranked
+
+    def create_follows(self, mean):
+        users = len(self.user_ids)
+        if users < 2 or mean <= 0:
+            return 0
+        authors = self.ranked(self.user_ids)
+        weights = zipf_weights(users, FOLLOWED_EXPONENT)
+        pareto_mean = FOLLOWING_SHAPE / (FOLLOWING_SHAPE - 1)
+
+        def follows():
+            for user_id in self.user_ids:
+                wanted = min(users - 1, int(
+                    self.random.paretovariate(FOLLOWING_SHAPE)
+                    * mean / pareto_mean
+                ))
+                chosen = set()
+                # Популярных авторов выбирают чаще; повторы и подписка
+                # на себя отбрасываются, поэтому попыток с запасом.
+                for author_id in self.random.choices(
+                    authors, cum_weights=weights, k=wanted * 2
+                ):
+                    if len(chosen) == wanted:
+                        break
+                    if author_id != user_id and author_id not in chosen:
+                        chosen.add(author_id)
+                        self.authors.add(author_id)
+                        self.followers.add(user_id)
+                        yield Follow(user_id=user_id, author_id=author_id)
+
+        return self.insert(Follow, follows())
+
+    def create_images(self, count):
+        """
+        Картинки для постов; одинаковые файлы хранятся один раз.
+        bulk_create не шлёт post_save, поэтому миниатюры создаются здесь,
+        пока ни один пост не показан с заглушкой.
+        """
+        for number in range(count):
+            image = Image.new('RGB', IMAGE_SIZE, self.color())
+            draw = ImageDraw.Draw(image)
+            for _ in range(12):
+                x, y = (self.random.randrange(size) for size in IMAGE_SIZE)
+                radius = self.random.randrange(20, 300)
+                draw.ellipse(
+                    (x - radius, y - radius, x + radius, y + radius),
+                    fill=self.color(),
+                )
+            buffer = BytesIO()
+            image.save(buffer, 'JPEG', quality=85)
+            name = post_image_storage.save(
+                f'posts/{self.prefix}-{number}.jpg',
+                ContentFile(buffer.getvalue()),
+            )
+            generate_post_thumbnail(name)
+            self.images.append(name)
+        return count
+
+    def color(self):
+        return tuple(self.random.randrange(256) for _ in range(3))
+
+    def create_posts(self, count, image_ratio):
+        if not self.user_ids:
+            return 0
+        after = last_pk(Post)
+        authors = self.ranked(self.user_ids)
+        author_weights = zipf_weights(len(authors), POSTING_EXPONENT)
+        groups = self.ranked(self.group_ids)
+        group_weights = zipf_weights(len(groups), GROUP_EXPONENT)
+        references = Counter()
+
+        def posts():
+            for _ in range(count):
+                author_id, = self.random.choices(
+                    authors, cum_weights=author_weights
+                )
+                group_id = None
+                if groups and self.random.random() < GROUP_SHARE:
+                    group_id, = self.random.choices(
+                        groups, cum_weights=group_weights
+                    )
+                image = ''
+                if self.images and self.random.random() < image_ratio:
+                    image = self.random.choice(self.images)
+                    references[image] += 1
+                pub_date = self.moment()
+                self.authors.add(author_id)
+                yield Post(
+                    author_id=author_id, group_id=group_id,
+                    text=self.text(), pub_date=pub_date, updated=pub_date,
+                    image=image,
+                    image_width=IMAGE_SIZE[0] if image else None,
+                    image_height=IMAGE_SIZE[1] if image else None,
+                    image_format='JPEG' if image else '',
+                )
+
+        total = self.insert(Post, posts())
+        for name, count in references.items():
+            if not StoredImage.objects.filter(name=name).update(
+                references=F('references') + count
+            ):
+                StoredImage.objects.create(name=name, references=count)
+        for pk, pub_date in Post.objects.filter(pk__gt=after).order_by(
+            'pk'
+        ).values_list('pk', 'pub_date').iterator():
+            self.post_ids.append(pk)
+            self.post_times.append(pub_date.timestamp())
+        return total
+
+    def create_comments(self, count):
+        if not self.post_ids or not self.user_ids:
+            return 0
+        order = list(range(len(self.post_ids)))
+        self.random.shuffle(order)
+        weights = zipf_weights(len(order), COMMENTED_EXPONENT)
+
+        def comments():
+            for _ in range(count):
+                index, = self.random.choices(order, cum_weights=weights)
+                posted = self.post_times[index]
+                yield Comment(
+                    post_id=self.post_ids[index],
+                    author_id=self.random.choice(self.user_ids),
+                    text=self.text(8),
+                    pub_date=datetime.fromtimestamp(
+                        posted + self.random.expovariate(1 / COMMENT_DELAY),
+                        timezone.utc,
+                    ),
+                )
+
+        return self.insert(Comment, comments())
@@ -0,0 +1,222 @@
+from functools import partial
+
+from django.db import connections, router, transaction
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.page_cache import purge_tags
+
+from .autocomplete import autocomplete_index
+from .caching import bump_versions
+from .counters import (bump_post, bump_user, bump_user_or_create,
+                       release_image, retain_image)
+from .feeds import (backfill_inbox, crossed_threshold_down, fan_out_post,
+                    followers_count, prune_inbox)
+from .models import Comment, Follow, Group, Post, User, UserStats
+from .search import ensure_search_triggers
+from .tasks import create_post_thumbnails, fill_author_inboxes
+from .thumbnails import delete_unreferenced_image
+
+
+def purge_on_commit(*tags):
+    """
+    Страницы сбрасываются после коммита: иначе параллельный запрос
+    успеет положить в кэш страницу со старыми данными уже после сброса.
+    """
+    transaction.on_commit(partial(purge_tags, *tags))
+
+
+def bump_on_commit(*names):
+    """То же для версий фрагментов: новая версия — только с новыми данными."""
+    transaction.on_commit(partial(bump_versions, *names))
+
+
+@receiver(post_save, sender=User)
+def create_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def deliver_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_user_or_create(instance.author_id, posts_count=1)
+        fan_out_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def forget_post(sender, instance, **kwargs):
+    bump_user(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_post(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    bump_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def fill_inbox(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_user_or_create(instance.author_id, followers_count=1)
+        bump_user_or_create(instance.user_id, following_count=1)
+        backfill_inbox(instance)
+        bump_on_commit(f'following:{instance.user_id}')
+
+
+@receiver(post_delete, sender=Follow)
+def clear_inbox(sender, instance, **kwargs):
+    demoted = False
+    if bump_user(instance.author_id, followers_count=-1):
+        # Сигнал приходит на каждую удалённую подписку, и счётчик
+        # уменьшается по одной: до и после — соседние значения.
+        after = followers_count(instance.author_id)
+        demoted = crossed_threshold_down(after + 1, after)
+    bump_user(instance.user_id, following_count=-1)
+    prune_inbox(instance)
+    if demoted:
+        # До тысячи входящих — не в запросе отписавшегося.
+        fill_author_inboxes.delay(instance.author_id)
+    bump_on_commit(f'following:{instance.user_id}')
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous(sender, instance, raw=False, **kwargs):
+    instance._previous_group_id = None
+    instance._previous_image = ''
+    if instance.pk and not raw:
+        instance._previous_group_id, instance._previous_image = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'group_id', 'image'
+            ).first() or (None, '')
+        )
+
+
+def release_post_image(name):
+    if release_image(name):
+        transaction.on_commit(partial(delete_unreferenced_image, name))
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_image', '')
+    if raw or instance.image.name == previous:
+        return
+    if instance.image:
+        retain_image(instance.image.name)
+    if previous:
+        release_post_image(previous)
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnail(sender, instance, raw=False, **kwargs):
+    """
+    Миниатюра новой картинки создаётся фоновой задачей, а не при показе,
+    откуда бы пост ни сохранили: сайт, админка, скрипт.
+    """
+    previous = getattr(instance, '_previous_image', '')
+    if raw or not instance.image or instance.image.name == previous:
+        return
+    transaction.on_commit(partial(create_post_thumbnails.delay, instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def release_image_reference(sender, instance, **kwargs):
+    if instance.image:
+        release_post_image(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_fragments(sender, instance, **kwargs):
+    group_ids = {
+        instance.group_id, getattr(instance, '_previous_group_id', None)
+    }
+    bump_on_commit(
+        'posts',
+        f'profile:{instance.author_id}',
+        *(f'group:{pk}' for pk in group_ids if pk is not None),
+    )
+    purge_on_commit(
+        'feed:index',
+        f'post:{instance.pk}',
+        f'user:{instance.author_id}',
+        *(f'group:{pk}' for pk in group_ids if pk is not None),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    bump_on_commit(f'comments:{instance.post_id}')
+    purge_on_commit(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_fragments(sender, instance, **kwargs):
+    bump_on_commit('posts', 'groups', f'group:{instance.pk}')
+    purge_on_commit(f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_fragments(sender, instance, update_fields=None,
+                                **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_on_commit('posts', 'authors', f'profile:{instance.pk}')
+    purge_on_commit(f'user:{instance.pk}')
+
+
+def reindex_on_commit(kind, pk, suggestions=None):
+    """
+    Индекс меняется на месте только после коммита: откат не оставит
+    в нём подсказок. Другие процессы применят изменение по журналу.
+    suggestions=None — объект удалён.
+    """
+    def apply():
+        if suggestions is None:
+            autocomplete_index.remove(kind, pk)
+        else:
+            autocomplete_index.update(suggestions, kind, pk)
+        autocomplete_index.changed(kind, pk)
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=User)
+def index_username(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    reindex_on_commit(
+        'user', instance.pk,
+        autocomplete_index.user_suggestions(instance.pk, instance.username),
+    )
+
+
+@receiver(post_save, sender=Group)
+def index_group(sender, instance, **kwargs):
+    reindex_on_commit(
+        'group', instance.pk,
+        autocomplete_index.group_suggestions(
+            instance.pk, instance.slug, instance.title
+        ),
+    )
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def unindex_autocomplete(sender, instance, **kwargs):
+    reindex_on_commit('user' if sender is User else 'group', instance.pk)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == 'posts' and router.allow_migrate(using, 'posts'):
+        ensure_search_triggers(connections[using])
@@ -0,0 +1,172 @@
+from abc import ABC, abstractmethod
+from hashlib import md5
+from io import StringIO
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import quote_etag
+from django.utils.text import Truncator
+from django.utils.xmlutils import SimplerXMLGenerator
+
+FEED_ITEMS: int = 2000
+FEED_CHUNK_SIZE: int = 100
+FEED_CACHE_TIMEOUT: int = 60 * 60
+FEED_CACHE_MAX_BYTES: int = 512 * 1024
+FEED_KEY_PREFIX: str = 'syndication'
+FEED_TITLE_LENGTH: int = 50
+
+
+class StreamingFeedMixin(ABC):
+    """
+    Лента, которая пишется кусками по мере чтения постов, а не
+    собирается целиком в памяти, как SyndicationFeed.write().
+    """
+
+    item_element = 'item'
+
+    def __init__(self, *args, latest=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latest = latest
+
+    def latest_post_date(self):
+        return self.latest or super().latest_post_date()
+
+    def make_item(self, **kwargs):
+        # add_item приводит аргументы к виду, который ждут
+        # add_item_elements; сам список items не копится.
+        self.add_item(**kwargs)
+        return self.items.pop()
+
+    @abstractmethod
+    def start_document(self, handler):
+        """Открывает корневые элементы и пишет данные самой ленты."""
+
+    @abstractmethod
+    def end_document(self, handler):
+        """Закрывает корневые элементы."""
+
+    def stream(self, items):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(
+            buffer, 'utf-8', short_empty_elements=True
+        )
+        handler.startDocument()
+        self.start_document(handler)
+        for number, item in enumerate(items, 1):
+            handler.startElement(self.item_element, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            if number % FEED_CHUNK_SIZE == 0:
+                yield drain(buffer)
+        self.end_document(handler)
+        yield drain(buffer)
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    def start_document(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_document(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def start_document(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_document(self, handler):
+        handler.endElement('feed')
+
+
+FEED_CLASSES = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+def drain(buffer):
+    chunk = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+def post_items(feed, request, posts):
+    for post in posts.iterator(chunk_size=FEED_CHUNK_SIZE):
+        link = request.build_absolute_uri(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        yield feed.make_item(
+            title=Truncator(post.text).chars(FEED_TITLE_LENGTH),
+            link=link,
+            unique_id=link,
+            description=post.text,
+            pubdate=post.pub_date,
+            updateddate=post.updated,
+            author_name=post.author.get_full_name() or post.author.username,
+            categories=(post.group.title,) if post.group_id else None,
+        )
+
+
+def cache_while_streaming(key, chunks):
+    """
+    Отдаёт куски дальше и кладёт ленту в кэш, если она уложилась
+    в FEED_CACHE_MAX_BYTES. Большие ленты в памяти не копятся.
+    """
+    collected, size = [], 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size > FEED_CACHE_MAX_BYTES:
+            collected = None
+        elif collected is not None:
+            collected.append(chunk)
+        yield chunk
+    if collected is not None:
+        cache.set(key, b''.join(collected), FEED_CACHE_TIMEOUT)
+
+
+def feed_response(request, feed_format, posts, version, **feed_kwargs):
+    """
+    Потоковая RSS/Atom-лента по posts. Валидатор и ключ кэша строятся
+    по дате самого свежего поста и версии данных ленты.
+
+    Last-Modified не отдаётся: правка или удаление поста не двигают
+    дату самого свежего, и клиент с одним If-Modified-Since получил бы
+    304 со старой лентой. Версия есть только в ETag.
+    """
+    feed_class = FEED_CLASSES[feed_format]
+    posts = posts.order_by('-pub_date', '-pk')
+    latest = posts.values_list('pub_date', flat=True).first()
+    etag = md5(repr(
+        [request.build_absolute_uri(), feed_format, latest, version]
+    ).encode()).hexdigest()
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f'{FEED_KEY_PREFIX}:{etag}'
+        content = cache.get(key)
+        if content is not None:
+            response = HttpResponse(content)
+        else:
+            feed = feed_class(
+                link=request.build_absolute_uri(feed_kwargs.pop('link')),
+                feed_url=request.build_absolute_uri(),
+                latest=latest,
+                **feed_kwargs,
+            )
+            items = post_items(feed, request, posts[:FEED_ITEMS])
+            response = StreamingHttpResponse(
+                cache_while_streaming(key, feed.stream(items))
+            )
+        response['Content-Type'] = feed_class.content_type
+    response['ETag'] = quote_etag(etag)
+    return response
@@ -0,0 +1,23 @@
+from jobs.queue import task
+
+from .feeds import fill_inboxes
+from .models import Post
+from .thumbnails import generate_post_thumbnail, refresh_post
+
+
+@task(queue='thumbnails')
+def create_post_thumbnails(post_id):
+    """Миниатюры картинки поста; затем сброс страниц с заглушкой."""
+    name = Post.objects.filter(pk=post_id).values_list(
+        'image', flat=True
+    ).first()
+    if not name:
+        return
+    generate_post_thumbnail(name)
+    refresh_post(post_id)
+
+
+@task()
+def fill_author_inboxes(author_id):
+    """Догоняет входящие всех подписчиков автора одним INSERT … SELECT."""
+    fill_inboxes([author_id])
@@ -0,0 +1,16 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..caching import render_post_fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_fragments(posts, show_group_link=False, show_author_link=False):
+    return [
+        mark_safe(fragment)
+        for fragment in render_post_fragments(
+            posts, show_group_link, show_author_link
+        )
+    ]
@@ -0,0 +1,11 @@
+from django import template
+
+from ..thumbnails import post_picture as picture
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(image):
+    """<picture> с вариантами миниатюры или заглушка, пока их нет."""
+    return {'picture': picture(image)}
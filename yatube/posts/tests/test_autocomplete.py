@@ -0,0 +1,157 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..autocomplete import (
+    AUTOCOMPLETE_SEQUENCE, autocomplete_index, change_key, next_sequence,
+)
+from ..models import Group
+
+User = get_user_model()
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo')
+        User.objects.create_user(username='leonid')
+        User.objects.create_user(username='mark')
+        cls.group = Group.objects.create(
+            title='Лесные коты',
+            slug='leopards',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        autocomplete_index.clear()
+        self.guest_client = Client()
+
+    def run_on_commit(self):
+        callbacks = connection.run_on_commit
+        connection.run_on_commit = []
+        for _, callback in callbacks:
+            callback()
+
+    def values(self, prefix, **kwargs):
+        return [
+            suggestion.value
+            for suggestion in autocomplete_index.search(prefix, **kwargs)
+        ]
+
+    def test_prefix_search_without_queries(self):
+        """Загруженный индекс отвечает без запросов к БД."""
+        autocomplete_index.load()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.values('LE'), ['Leo', 'leonid', 'leopards'])
+            self.assertEqual(self.values('лес'), ['leopards'])
+            self.assertEqual(
+                self.values('leo', kind='user'), ['Leo', 'leonid']
+            )
+            self.assertEqual(self.values('x'), [])
+            self.assertEqual(self.values(''), [])
+
+    def test_group_matched_by_slug_and_title_once(self):
+        Group.objects.filter(pk=self.group.pk).update(title='Leopards Club')
+        autocomplete_index.load()
+        self.assertEqual(self.values('leop'), ['leopards'])
+
+    def test_signals_update_index(self):
+        """Создание, переименование и удаление меняют индекс на месте."""
+        autocomplete_index.load()
+        user = User.objects.create_user(username='leon')
+        self.assertEqual(self.values('leon'), ['leonid'])
+        self.run_on_commit()
+        self.assertIn('leon', self.values('leon'))
+        user.username = 'zed'
+        user.save()
+        self.run_on_commit()
+        self.assertEqual(self.values('leon'), ['leonid'])
+        self.assertEqual(self.values('ze'), ['zed'])
+        group = Group.objects.get(pk=self.group.pk)
+        group.delete()
+        self.run_on_commit()
+        self.assertEqual(self.values('leop'), [])
+
+    def test_rolled_back_save_not_indexed(self):
+        autocomplete_index.load()
+        with transaction.atomic():
+            User.objects.create_user(username='leon')
+            transaction.set_rollback(True)
+        self.run_on_commit()
+        self.assertEqual(self.values('leon'), ['leonid'])
+
+    def test_change_from_other_process_applied_in_place(self):
+        """Чужое изменение применяется по журналу, без полной загрузки."""
+        autocomplete_index.load()
+        User.objects.bulk_create([User(username='leon')])
+        leon = User.objects.get(username='leon')
+        cache.set(change_key(next_sequence()), ('user', leon.pk))
+        self.assertEqual(self.values('leon'), ['leonid'])
+        with mock.patch('posts.autocomplete.AUTOCOMPLETE_CHECK_INTERVAL', 0):
+            with mock.patch.object(autocomplete_index, 'load') as load:
+                self.assertEqual(self.values('leon'), ['leon', 'leonid'])
+        load.assert_not_called()
+
+    def test_writer_does_not_reload(self):
+        autocomplete_index.load()
+        User.objects.create_user(username='leon')
+        self.run_on_commit()
+        with mock.patch('posts.autocomplete.AUTOCOMPLETE_CHECK_INTERVAL', 0):
+            with self.assertNumQueries(0):
+                self.assertEqual(self.values('leon'), ['leon', 'leonid'])
+
+    def test_colliding_change_numbers_reload_index(self):
+        autocomplete_index.load()
+        User.objects.bulk_create([User(username='leon')])
+        number = next_sequence()
+        cache.set(change_key(number), ('group', self.group.pk))
+        cache.set(AUTOCOMPLETE_SEQUENCE, number - 1)
+        autocomplete_index.changed('group', self.group.pk)
+        with mock.patch('posts.autocomplete.AUTOCOMPLETE_CHECK_INTERVAL', 0):
+            self.assertEqual(self.values('leon'), ['leon', 'leonid'])
+
+    def test_lost_changes_reload_index(self):
+        autocomplete_index.load()
+        User.objects.bulk_create([User(username='leon')])
+        cache.delete(AUTOCOMPLETE_SEQUENCE)
+        with mock.patch('posts.autocomplete.AUTOCOMPLETE_CHECK_INTERVAL', 0):
+            self.assertEqual(self.values('leon'), ['leon', 'leonid'])
+
+    def test_load_keeps_entries_sorted(self):
+        entries = autocomplete_index.load()
+        self.assertEqual(entries, sorted(entries))
+
+    def test_api_endpoint(self):
+        response = self.guest_client.get(
+            reverse('api:autocomplete'), {'q': 'leop'}
+        )
+        self.assertEqual(response.json(), {'results': [{
+            'type': 'group',
+            'value': 'leopards',
+            'label': 'Лесные коты',
+            'url': reverse('posts:group_list', args=('leopards',)),
+        }]})
+        response = self.guest_client.get(
+            reverse('api:autocomplete'), {'q': 'le', 'kind': 'post'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_autocomplete_uses_index(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_group_autocomplete'), {'term': 'leo'}
+        )
+        self.assertEqual(
+            [item['id'] for item in response.json()['results']],
+            [str(self.group.pk)],
+        )
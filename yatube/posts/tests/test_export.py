@@ -0,0 +1,102 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..exporting import Exporter
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='leo')
+        cls.reader = User.objects.create_user(username='masha')
+        cls.group = Group.objects.create(
+            title='Кошки', slug='cats', description='О кошках'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author,
+                group=cls.group if number % 2 else None,
+            )
+            for number in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def read_jsonl(self, name):
+        with gzip.open(os.path.join(self.directory, name), 'rt') as lines:
+            return [json.loads(line) for line in lines]
+
+    def test_export_jsonl_gzip(self):
+        """Все таблицы выгружаются в сжатый JSONL по файлу на таблицу."""
+        call_command(
+            'export_yatube', self.directory, '--compress', 'gzip',
+            '--chunk-size', '2', stdout=StringIO(),
+        )
+        posts = self.read_jsonl('posts.jsonl.gz')
+        self.assertEqual(
+            [post['id'] for post in posts],
+            [post.pk for post in self.posts],
+        )
+        self.assertEqual(posts[1]['author'], 'leo')
+        self.assertEqual(posts[1]['group'], 'cats')
+        self.assertIsNone(posts[0]['group'])
+        self.assertEqual(
+            self.read_jsonl('follows.jsonl.gz'),
+            [{'id': Follow.objects.get().pk, 'user': 'masha',
+              'author': 'leo'}],
+        )
+        self.assertEqual(len(self.read_jsonl('users.jsonl.gz')), 2)
+        self.assertNotIn('password', self.read_jsonl('users.jsonl.gz')[0])
+
+    def test_export_csv(self):
+        call_command(
+            'export_yatube', self.directory, '--format', 'csv',
+            '--tables', 'groups', 'comments', stdout=StringIO(),
+        )
+        path = os.path.join(self.directory, 'comments.csv')
+        with open(path, encoding='utf-8', newline='') as lines:
+            rows = list(csv.DictReader(lines))
+        self.assertEqual(rows[0]['text'], 'Комментарий')
+        self.assertEqual(rows[0]['author'], 'masha')
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory, 'posts.csv'))
+        )
+
+    def test_resume_after_interruption(self):
+        """Прерванная выгрузка продолжается без потерь и повторов."""
+        exporter = Exporter(self.directory, compress='gzip', chunk_size=2)
+        progress = exporter.run(['posts'])
+        self.assertEqual(next(progress), ('posts', 2))
+        progress.close()
+        # Недописанная пачка от упавшего процесса.
+        with open(os.path.join(self.directory, 'posts.jsonl.gz'), 'ab') as f:
+            f.write(b'\x1f\x8b broken')
+
+        call_command(
+            'export_yatube', self.directory, '--tables', 'posts',
+            '--resume', stdout=StringIO(),
+        )
+        self.assertEqual(
+            [post['id'] for post in self.read_jsonl('posts.jsonl.gz')],
+            [post.pk for post in self.posts],
+        )
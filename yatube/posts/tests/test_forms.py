@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -8,7 +9,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from ..models import Comment, Group, Post
+from ..models import Comment, Group, Post, post_image_storage
 
 User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -88,7 +89,9 @@ class PostFormTests(TestCase):
                 text=form_data['text'],
                 author=self.user,
                 group=form_data['group'],
-                image='posts/small.gif',
+                image=post_image_storage.digest_name(
+                    'posts/small.gif', hashlib.sha256(small_gif).hexdigest()
+                ),
             ).exists()
         )
 
@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from ..models import Post, StoredImage, post_image_storage
+from .test_thumbnails import SMALL_GIF
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def upload(content=SMALL_GIF, name='small.gif'):
+    return SimpleUploadedFile(name, content, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class StoredImageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, image):
+        return Post.objects.create(
+            text='Пост с картинкой', author=self.user, image=image
+        )
+
+    def run_on_commit(self):
+        callbacks = connection.run_on_commit
+        connection.run_on_commit = []
+        for _, callback in callbacks:
+            callback()
+
+    def test_same_image_shared_by_posts(self):
+        """Одинаковые картинки разных постов — один файл с двумя ссылками."""
+        first = self.create_post(upload(name='meme.gif'))
+        second = self.create_post(upload(name='repost.gif'))
+        self.assertEqual(first.image.name, second.image.name)
+        stored = StoredImage.objects.get(name=first.image.name)
+        self.assertEqual(stored.references, 2)
+
+    def test_file_deleted_with_last_reference(self):
+        """Файл удаляется, только когда на него не ссылается ни один пост."""
+        first = self.create_post(upload())
+        second = self.create_post(upload())
+        name = first.image.name
+        first.delete()
+        self.run_on_commit()
+        self.assertTrue(post_image_storage.exists(name))
+        second.delete()
+        self.run_on_commit()
+        self.assertFalse(post_image_storage.exists(name))
+        self.assertFalse(StoredImage.objects.filter(name=name).exists())
+
+    def test_replaced_image_released(self):
+        """Замена картинки переносит ссылку на новый файл."""
+        post = self.create_post(upload())
+        old_name = post.image.name
+        post.image = upload(SMALL_GIF + b'\x00', 'other.gif')
+        post.save()
+        self.run_on_commit()
+        self.assertFalse(StoredImage.objects.filter(name=old_name).exists())
+        self.assertFalse(post_image_storage.exists(old_name))
+        self.assertEqual(
+            StoredImage.objects.get(name=post.image.name).references, 1
+        )
@@ -0,0 +1,200 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..autocomplete import autocomplete_index
+from ..models import Follow, Group, InboxEntry, Post, UserStats
+
+User = get_user_model()
+
+RECORDS = [
+    {'type': 'group', 'slug': 'cats', 'title': 'Кошки',
+     'description': 'О кошках'},
+    {'type': 'post', 'author': 'leo', 'text': 'Первый',
+     'group': 'cats', 'pub_date': '2015-03-01T10:00:00+00:00'},
+    {'type': 'post', 'author': 'leo', 'text': 'Второй'},
+    {'type': 'post', 'author': 'masha', 'text': 'Третий', 'group': 'dogs'},
+    {'type': 'follow', 'user': 'masha', 'author': 'leo'},
+    {'type': 'follow', 'user': 'leo', 'author': 'leo'},
+    {'type': 'comment', 'text': '?'},
+]
+
+
+class ImportPostsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        autocomplete_index.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file_:
+            file_.write(content)
+        return path
+
+    def import_records(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_jsonl(self):
+        """Группы, посты и подписки создаются, ошибки пропускаются."""
+        User.objects.create_user(username='masha')
+        path = self.write(
+            'dump.jsonl', '\n'.join(json.dumps(item) for item in RECORDS)
+        )
+        out, err = self.import_records(path, '--batch-size', '3')
+
+        self.assertIn('постов — 2', out)
+        self.assertIn('пропущено — 3', out)
+        self.assertIn('Строка 4: Нет группы dogs.', err)
+        self.assertIn('Строка 7: Неизвестный тип: comment.', err)
+
+        leo = User.objects.get(username='leo')
+        self.assertFalse(leo.has_usable_password())
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group, Group.objects.get(slug='cats'))
+        self.assertEqual(first.pub_date.year, 2015)
+        self.assertTrue(Follow.objects.filter(
+            user__username='masha', author=leo
+        ).exists())
+
+    def test_deferred_pass(self):
+        """Счётчики, входящие и индекс подсказок готовы после импорта."""
+        path = self.write(
+            'dump.jsonl', '\n'.join(json.dumps(item) for item in RECORDS)
+        )
+        self.import_records(path)
+        leo = User.objects.get(username='leo')
+        stats = UserStats.objects.get(user=leo)
+        self.assertEqual((stats.posts_count, stats.followers_count), (2, 1))
+        self.assertEqual(
+            InboxEntry.objects.filter(user__username='masha').count(), 2
+        )
+        self.assertEqual(
+            [item.value for item in autocomplete_index.search('le')],
+            ['leo'],
+        )
+
+    def test_import_csv_with_type(self):
+        path = self.write(
+            'posts.csv',
+            'author,text,pub_date\n'
+            'leo,"Текст, с запятой",2020-01-01 12:00\n'
+            'ivan,Ещё,\n',
+        )
+        out, _ = self.import_records(path, '--type', 'post')
+        self.assertIn('постов — 2', out)
+        self.assertIn('новых пользователей — 2', out)
+        self.assertTrue(
+            Post.objects.filter(text='Текст, с запятой').exists()
+        )
+
+    def test_batches_use_bulk_inserts(self):
+        """Посты вставляются пачками bulk_create, а не по одному."""
+        lines = '\n'.join(
+            json.dumps({'author': f'user{number % 5}', 'text': str(number)})
+            for number in range(200)
+        )
+        path = self.write('many.jsonl', lines)
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                'import_posts', path, '--type', 'post',
+                '--batch-size', '200', stdout=StringIO(),
+            )
+        inserts = [
+            query for query in queries
+            if query['sql'].startswith('INSERT INTO "posts_post"')
+        ]
+        self.assertLess(len(inserts), 5)
+        self.assertEqual(Post.objects.count(), 200)
+
+    def test_bad_lines_rejected(self):
+        """Битые строки пропускаются с номерами, остальное импортируется."""
+        lines = [json.dumps(item) for item in RECORDS[:2]] + [
+            '{"type": "post", "author": "leo"',
+            '',
+            '["не объект"]',
+            json.dumps({'type': 'post', 'author': 'leo', 'text': 7}),
+            json.dumps({'type': 'post', 'author': ['leo'], 'text': 'Ещё'}),
+            json.dumps({'type': 'post', 'author': 'leo', 'text': 'Ещё',
+                        'pub_date': '2020-13-40T00:00:00'}),
+            json.dumps(RECORDS[4]),
+        ]
+        path = self.write('dump.jsonl', '\n'.join(lines))
+        out, err = self.import_records(path, '--batch-size', '2')
+        self.assertIn('постов — 1', out)
+        self.assertIn('подписок — 1', out)
+        self.assertIn('пропущено — 5', out)
+        self.assertIn('Строка 3: Неверный JSON', err)
+        self.assertIn('Строка 5: Запись должна быть объектом.', err)
+        self.assertIn('Строка 6: Поле text должно быть строкой.', err)
+        self.assertIn('Строка 7: Поле author должно быть строкой.', err)
+        self.assertIn('Строка 8: Неверная дата', err)
+        leo = User.objects.get(username='leo')
+        self.assertEqual(UserStats.objects.get(user=leo).followers_count, 1)
+        self.assertEqual(
+            InboxEntry.objects.filter(user__username='masha').count(), 1
+        )
+
+    def test_finish_runs_after_failure(self):
+        """Если импорт оборвался, записанные пакеты всё равно доделаны."""
+        path = self.write(
+            'dump.jsonl', '\n'.join(json.dumps(item) for item in RECORDS)
+        )
+        missing = os.path.join(self.directory, 'missing.jsonl')
+        with self.assertRaises(CommandError):
+            self.import_records(path, missing, '--batch-size', '3')
+        leo = User.objects.get(username='leo')
+        self.assertEqual(UserStats.objects.get(user=leo).posts_count, 2)
+        self.assertEqual(
+            InboxEntry.objects.filter(user__username='masha').count(), 2
+        )
+
+    def test_bad_csv_row_rejected(self):
+        path = self.write(
+            'posts.csv',
+            'author,text\n'
+            f'leo,{"x" * 200000}\n'
+            'ivan,Ещё\n',
+        )
+        out, err = self.import_records(path, '--type', 'post')
+        self.assertIn('постов — 1', out)
+        self.assertIn('пропущено — 1', out)
+        self.assertIn('Строка 2: Неверная строка CSV', err)
+
+    def test_duplicates_not_counted(self):
+        """Уже существующие подписки и группы не считаются новыми."""
+        path = self.write(
+            'dump.jsonl', '\n'.join(json.dumps(item) for item in RECORDS)
+        )
+        self.import_records(path)
+        out, _ = self.import_records(path)
+        self.assertIn('групп — 0', out)
+        self.assertIn('подписок — 0', out)
+        self.assertIn('новых пользователей — 0', out)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_model_dates_untouched(self):
+        """Импорт ставит даты из файла, не выключая auto_now у поля."""
+        path = self.write(
+            'dump.jsonl', '\n'.join(json.dumps(item) for item in RECORDS)
+        )
+        self.import_records(path)
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.pub_date.year, 2015)
+        self.assertEqual(first.updated, first.pub_date)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        self.assertTrue(Post._meta.get_field('updated').auto_now)
+        post = Post.objects.create(text='Сейчас', author=first.author)
+        self.assertIsNotNone(post.pub_date)
@@ -0,0 +1,98 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+NUMBER_OF_POSTS: int = 15
+FULL_SCAN = re.compile(r'SCAN (TABLE )?"?posts_\w+"?\s*$')
+
+
+class FeedQueryPlanTest(TestCase):
+    """Запросы лент и страницы поста идут по индексам, без сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        for number in range(NUMBER_OF_POSTS):
+            cls.post = Post.objects.create(
+                text=f'Тестовый пост #{number}',
+                author=cls.user,
+                group=cls.group,
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Тестовый комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def query_plans(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'posts_' not in sql:
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans[sql] = [row[-1] for row in cursor.fetchall()]
+        return response, plans
+
+    def assertIndexedPlans(self, url):
+        response, plans = self.query_plans(url)
+        for sql, plan in plans.items():
+            with self.subTest(url=url, sql=sql):
+                self.assertFalse(
+                    any('TEMP B-TREE' in step for step in plan), plan
+                )
+                self.assertFalse(
+                    any(FULL_SCAN.search(step) for step in plan), plan
+                )
+        return response
+
+    def test_feed_queries_use_indexes(self):
+        feeds = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for feed in feeds:
+            page_obj = self.assertIndexedPlans(feed).context['page_obj']
+            self.assertIndexedPlans(feed + f'?cursor={page_obj.next_cursor}')
+        page_obj = self.assertIndexedPlans(
+            reverse('posts:follow_index')
+        ).context['page_obj']
+        self.assertIndexedPlans(
+            reverse('posts:follow_index') + f'?cursor={page_obj.next_cursor}'
+        )
+
+    @override_settings(FEED_FANOUT_THRESHOLD=0)
+    def test_pulled_follow_feed_uses_indexes(self):
+        """Подмешивание «тяжёлого» автора — тоже проход по индексам."""
+        url = reverse('posts:follow_index')
+        page_obj = self.assertIndexedPlans(url).context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertIndexedPlans(url + f'?cursor={page_obj.next_cursor}')
+
+    def test_post_detail_queries_use_indexes(self):
+        self.assertIndexedPlans(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
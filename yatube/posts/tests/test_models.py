@@ -1,7 +1,10 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Comment, Group, Post
+from ..models import Comment, Follow, Group, Post, UserStats
 
 User = get_user_model()
 POST_STR_LENGTH: int = 15
@@ -138,3 +141,38 @@ class CommentModelTest(TestCase):
             with self.subTest(value=value):
                 self.assertEqual(
                     comment._meta.get_field(value).help_text, expected)
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='TestUser')
+        self.reader = User.objects.create_user(username='Reader')
+
+    def test_counters_follow_writes(self):
+        """Счётчики меняются вместе с постами, комментариями и подписками."""
+        post = Post.objects.create(text='Тестовый пост', author=self.user)
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        follow = Follow.objects.create(user=self.reader, author=self.user)
+        self.user.stats.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 1)
+        self.assertEqual(self.user.stats.followers_count, 1)
+        self.assertEqual(UserStats.objects.get(
+            user=self.reader).following_count, 1)
+        self.assertEqual(post.comments_count, 1)
+        follow.delete()
+        post.delete()
+        self.user.stats.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 0)
+        self.assertEqual(self.user.stats.followers_count, 0)
+
+    def test_reconcile_counters_fixes_drift(self):
+        """Команда reconcile_counters исправляет разошедшиеся счётчики."""
+        Post.objects.bulk_create(
+            Post(text='Тестовый пост', author=self.user) for _ in range(3)
+        )
+        UserStats.objects.filter(user=self.reader).delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        self.user.stats.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 3)
+        self.assertTrue(UserStats.objects.filter(user=self.reader).exists())
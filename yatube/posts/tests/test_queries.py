@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+NUMBER_OF_POSTS: int = 10
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Число запросов страницы не зависит от числа постов на ней."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(NUMBER_OF_POSTS):
+            cls.author = User.objects.create_user(username=f'user_{number}')
+            Follow.objects.create(user=cls.reader, author=cls.author)
+            cls.post = Post.objects.create(
+                text=f'Тестовый пост #{number}',
+                author=cls.author,
+                group=cls.group,
+            )
+        for commenter in User.objects.all():
+            Comment.objects.create(
+                post=cls.post, author=commenter, text='Комментарий'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_guest_query_budget(self):
+        budgets = {
+            reverse('posts:index'): 1,
+            reverse('posts:group_list',
+                    kwargs={'slug': self.group.slug}): 2,
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}): 2,
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.post.pk}): 2,
+            reverse('posts:post_comments',
+                    kwargs={'post_id': self.post.pk}): 2,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.guest_client, url, budget)
+
+    def test_authorized_query_budget(self):
+        budgets = {
+            reverse('posts:index'): 3,
+            reverse('posts:follow_index'): 4,
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}): 5,
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.post.pk}): 4,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.authorized_client, url, budget)
@@ -0,0 +1,127 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import FTS_TABLE
+from ..views import POSTS_PER_PAGE
+from .utils import run_on_commit
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_ranked_by_relevance(self):
+        """Посты с большим числом совпадений идут первыми."""
+        Post.objects.create(text='Кот спит', author=self.user)
+        best = Post.objects.create(text='Кот, кот и ещё кот', author=self.user)
+        Post.objects.create(text='Собака лает', author=self.user)
+        page = self.search('кот')
+        self.assertEqual(len(page), 2)
+        self.assertEqual(page[0], best)
+
+    def test_cursor_pagination(self):
+        for number in range(POSTS_PER_PAGE + 2):
+            Post.objects.create(text=f'Запись номер {number}',
+                                author=self.user)
+        first = self.search('запись')
+        self.assertEqual(len(first), POSTS_PER_PAGE)
+        self.assertTrue(first.has_next())
+        rest = self.search('запись', cursor=first.next_cursor)
+        self.assertEqual(len(rest), 2)
+        self.assertFalse(rest.has_next())
+        self.assertFalse(set(first) & set(rest))
+        self.assertEqual((first.number, rest.number), (1, 2))
+        self.assertTrue(rest.has_previous())
+        self.assertEqual(rest.previous_page_number(), 1)
+        self.assertEqual(rest.start_index(), POSTS_PER_PAGE + 1)
+        self.assertEqual(rest.paginator.count, POSTS_PER_PAGE + 2)
+        self.assertEqual(rest.paginator.num_pages, 2)
+
+    def test_index_follows_edits_and_deletes(self):
+        """Триггеры обновляют индекс при изменении и удалении поста."""
+        post = Post.objects.create(text='Старый текст', author=self.user)
+        run_on_commit()
+        Post.objects.filter(pk=post.pk).update(text='Новый текст')
+        self.assertEqual(list(self.search('старый')), [])
+        self.assertEqual(list(self.search('новый')), [post])
+        post.delete()
+        run_on_commit()
+        self.assertEqual(list(self.search('новый')), [])
+
+    def test_query_syntax_is_safe(self):
+        Post.objects.create(text='Кот', author=self.user)
+        for query in ('"', 'кот AND', 'NEAR(', '*', '-кот'):
+            with self.subTest(query=query):
+                self.search(query)
+
+    def test_control_characters_ignored(self):
+        """NUL и другие управляющие символы не ломают запрос к FTS5."""
+        post = Post.objects.create(text='Кот', author=self.user)
+        self.assertEqual(list(self.search('\x00')), [])
+        self.assertEqual(list(self.search('ко\x00т')), [post])
+        client = Client()
+        client.force_login(self.admin)
+        for query, expected in (('\x00', []), ('\x01ко\x00т', [post])):
+            with self.subTest(query=query):
+                response = client.get(
+                    reverse('admin:posts_post_changelist'), {'q': query}
+                )
+                self.assertEqual(
+                    list(response.context['cl'].result_list), expected
+                )
+
+    def test_unparsed_query_gives_empty_page(self):
+        """Запрос, который FTS5 отверг, — пустая страница, а не 500."""
+        Post.objects.create(text='Кот', author=self.user)
+        with mock.patch('posts.search.match_expression', return_value='"'):
+            page = self.search('кот')
+            self.assertEqual(list(page), [])
+            self.assertEqual(page.paginator.count, 0)
+
+    def test_admin_search_uses_index(self):
+        post = Post.objects.create(text='Редкое слово', author=self.user)
+        Post.objects.create(text='Обычный текст', author=self.user)
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'редкое'}
+        )
+        self.assertEqual(list(response.context['cl'].result_list), [post])
+
+    def test_rebuild_command(self):
+        Post.objects.create(text='Кот', author=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+            )
+        self.assertEqual(list(self.search('кот')), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(len(self.search('кот')), 1)
@@ -0,0 +1,144 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+
+from ..models import (Comment, Follow, Group, InboxEntry, Post, StoredImage,
+                      UserStats, post_image_storage)
+from ..seeding import SEED_EPOCH
+from ..thumbnails import cached_post_thumbnail
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedScaleTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, *args):
+        out = StringIO()
+        call_command(
+            'seed_scale', '--users', '50', '--groups', '5', '--posts', '300',
+            '--follows', '5', '--comments', '200', '--images', '2',
+            '--image-ratio', '0.5', '--batch-size', '64', *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def snapshot(self, prefix):
+        """Данные запуска без pk и префикса: для сравнения запусков."""
+        users = User.objects.filter(username__startswith=prefix)
+        number = {
+            pk: username[len(prefix):]
+            for pk, username in users.values_list('pk', 'username')
+        }
+        posts = Post.objects.filter(author__in=users).order_by('pk')
+        return (
+            sorted(
+                (number[user], number[author]) for user, author in
+                Follow.objects.filter(user__in=users).values_list(
+                    'user', 'author'
+                )
+            ),
+            [
+                (number[author], group and group.split('-', 1)[1], text,
+                 pub_date, bool(image))
+                for author, group, text, pub_date, image in posts.values_list(
+                    'author', 'group__slug', 'text', 'pub_date', 'image'
+                )
+            ],
+            list(Comment.objects.filter(post__in=posts).order_by(
+                'pk'
+            ).values_list('text', 'pub_date')),
+        )
+
+    def test_seed_creates_rows(self):
+        out = self.seed()
+        self.assertIn('users: 50', out)
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Follow.objects.filter(
+            user=F('author')
+        ).exists())
+        user = User.objects.first()
+        self.assertTrue(user.check_password('password'))
+        self.assertTrue(all(
+            post.pub_date <= SEED_EPOCH for post in Post.objects.all()
+        ))
+
+    def test_distributions_are_skewed(self):
+        """Первые по популярности авторы и группы получают больше."""
+        self.seed()
+        posts = sorted(
+            Post.objects.order_by().values('author').annotate(
+                count=Count('pk')
+            ).values_list('count', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(posts[0], 5 * 300 / 50)
+        followers = sorted(
+            Follow.objects.order_by().values('author').annotate(
+                count=Count('pk')
+            ).values_list('count', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(followers[0], 3 * followers[len(followers) // 2])
+        self.assertTrue(Post.objects.filter(group=None).exists())
+
+    def test_counters_inbox_and_images(self):
+        """После загрузки счётчики, ленты и ссылки на картинки верны."""
+        self.seed()
+        for stats in UserStats.objects.all():
+            self.assertEqual(
+                stats.posts_count,
+                Post.objects.filter(author=stats.user_id).count(),
+            )
+            self.assertEqual(
+                stats.following_count,
+                Follow.objects.filter(user=stats.user_id).count(),
+            )
+        follow = Follow.objects.first()
+        self.assertEqual(
+            InboxEntry.objects.filter(user=follow.user_id).count(),
+            Post.objects.filter(
+                author__following__user=follow.user_id
+            ).count(),
+        )
+        images = Post.objects.exclude(image='')
+        self.assertTrue(images.exists())
+        self.assertEqual(
+            sum(StoredImage.objects.values_list('references', flat=True)),
+            images.count(),
+        )
+        for post in images:
+            self.assertTrue(post_image_storage.exists(post.image.name))
+            self.assertIsNotNone(cached_post_thumbnail(post.image))
+
+    def test_same_seed_same_data(self):
+        self.seed('--prefix', 'first')
+        self.seed('--prefix', 'second')
+        self.seed('--prefix', 'third', '--seed', '1')
+        self.assertEqual(self.snapshot('first'), self.snapshot('second'))
+        self.assertNotEqual(self.snapshot('first'), self.snapshot('third'))
+
+    def test_existing_prefix_rejected(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.assertEqual(User.objects.count(), 50)
@@ -0,0 +1,106 @@
+from time import time
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..models import Group, Post
+from .utils import run_on_commit
+
+User = get_user_model()
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class SyndicationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(text='Пост в группе', author=cls.user,
+                            group=cls.group)
+        Post.objects.create(text='Пост без группы', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_xml(self, url):
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, ElementTree.fromstring(
+            b''.join(response.streaming_content)
+            if response.streaming else response.content
+        )
+
+    def test_rss_and_atom_are_streamed(self):
+        """Ленты отдаются потоком и содержат посты от новых к старым."""
+        response, rss = self.get_xml(
+            reverse('posts:index_syndication', args=('rss',))
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            [item.findtext('description') for item in rss.iter('item')],
+            ['Пост без группы', 'Пост в группе'],
+        )
+        response, atom = self.get_xml(
+            reverse('posts:index_syndication', args=('atom',))
+        )
+        self.assertEqual(len(atom.findall(f'{ATOM}entry')), 2)
+
+    def test_group_and_profile_feeds(self):
+        _, rss = self.get_xml(reverse(
+            'posts:group_syndication', args=(self.group.slug, 'rss')
+        ))
+        self.assertEqual(
+            [item.findtext('description') for item in rss.iter('item')],
+            ['Пост в группе'],
+        )
+        _, rss = self.get_xml(reverse(
+            'posts:profile_syndication', args=('author', 'rss')
+        ))
+        self.assertEqual(len(list(rss.iter('item'))), 2)
+
+    def test_conditional_get_and_cache(self):
+        """Повтор с валидатором даёт 304, без него — ленту из кэша."""
+        url = reverse('posts:index_syndication', args=('atom',))
+        response, _ = self.get_xml(url)
+        etag = response['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response, _ = self.get_xml(url)
+        self.assertFalse(response.streaming)
+        Post.objects.create(text='Новый пост', author=self.user)
+        response, atom = self.get_xml(url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(atom.findall(f'{ATOM}entry')), 3)
+
+    def test_edit_not_hidden_by_if_modified_since(self):
+        """Правка старого поста не даёт 304 по If-Modified-Since."""
+        url = reverse('posts:index_syndication', args=('rss',))
+        response, _ = self.get_xml(url)
+        self.assertNotIn('Last-Modified', response)
+        post = Post.objects.order_by('pub_date').first()
+        post.text = 'Исправленный пост'
+        post.save()
+        run_on_commit()
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time() + 60)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Исправленный пост', b''.join(
+            response.streaming_content
+        ).decode())
+
+    def test_unknown_format(self):
+        response = self.guest_client.get(
+            reverse('posts:index_syndication', args=('json',))
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,146 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default
+
+from jobs.models import Job
+from jobs.worker import Worker
+
+from ..models import Post
+from ..thumbnails import (backend, cached_post_thumbnail,
+                          generate_post_thumbnail, thumbnail_formats,
+                          thumbnail_variants)
+from .utils import run_on_commit
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        default.kvstore.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'
+            ),
+        )
+        run_on_commit()
+        Job.objects.all().delete()
+
+    def test_placeholder_until_thumbnail_ready(self):
+        """Пока миниатюры нет, страница её не создаёт, а выводит заглушку."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.authorized_client.get(url)
+        self.assertTemplateUsed(
+            response, 'includes/thumbnail_placeholder.html'
+        )
+        self.assertIsNone(cached_post_thumbnail(self.post.image))
+
+        generate_post_thumbnail(self.post.image.name)
+        thumbnail = cached_post_thumbnail(self.post.image)
+        self.assertIsNotNone(thumbnail)
+        response = self.authorized_client.get(url)
+        self.assertContains(response, thumbnail.url)
+
+    def test_all_variants_in_srcset(self):
+        """Создаются все варианты, страница выводит их в srcset."""
+        generate_post_thumbnail(self.post.image.name)
+        for geometry, format_ in thumbnail_variants():
+            with self.subTest(geometry=geometry, format=format_):
+                self.assertIsNotNone(backend.get_cached_thumbnail(
+                    self.post.image, geometry, format=format_,
+                    crop='center', upscale=True,
+                ))
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        for width in (480, 960, 1440):
+            self.assertContains(response, f' {width}w')
+        self.assertContains(response, 'type="image/jpeg"')
+        self.assertContains(
+            response, f'sizes="{settings.POST_THUMBNAIL_SIZES}"'
+        )
+
+    @override_settings(POST_THUMBNAIL_FORMATS=('WEBP', 'JPEG', 'NOPE'))
+    def test_unsupported_formats_skipped(self):
+        Image.init()
+        expected = [
+            format_ for format_ in ('WEBP', 'JPEG') if format_ in Image.SAVE
+        ]
+        self.assertEqual(thumbnail_formats(), expected)
+
+    def test_generate_thumbnails_command(self):
+        """Команда создаёт миниатюры, которых нет в хранилище ключей."""
+        call_command('generate_thumbnails', stdout=StringIO())
+        self.assertIsNotNone(cached_post_thumbnail(self.post.image))
+
+    def test_create_enqueues_thumbnail_job(self):
+        """post_create ставит миниатюру в очередь после коммита."""
+        self.authorized_client.post(reverse('posts:post_create'), data={
+            'text': 'Новый пост',
+            'image': SimpleUploadedFile(
+                'new.gif', SMALL_GIF, content_type='image/gif'
+            ),
+        })
+        post = Post.objects.get(text='Новый пост')
+        self.assertFalse(Job.objects.exists())
+        run_on_commit()
+        job = Job.objects.get()
+        self.assertEqual(job.queue, 'thumbnails')
+        self.assertEqual(job.task, 'posts.tasks.create_post_thumbnails')
+        self.assertIsNone(cached_post_thumbnail(post.image))
+
+        Worker(name='worker').run(burst=True)
+        self.assertIsNotNone(cached_post_thumbnail(post.image))
+        self.assertFalse(Job.objects.exists())
+
+    def test_image_change_enqueues_thumbnail_job(self):
+        """Задачу ставит любое сохранение с новой картинкой."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        run_on_commit()
+        self.assertFalse(Job.objects.exists())
+        post.image = SimpleUploadedFile(
+            'other.gif', SMALL_GIF + b'\x00', content_type='image/gif'
+        )
+        post.save()
+        run_on_commit()
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'posts.tasks.create_post_thumbnails')
+        self.assertEqual(json.loads(job.payload)['args'], [post.pk])
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..forms import PostForm
+from ..models import Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def photo(size=(300, 200), orientation=6):
+    """JPEG с EXIF, как с телефона: повёрнут тегом Orientation."""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = 'Camera'
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile(
+        'photo.JPG', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def png_with_exif(size=(300, 200)):
+    exif = Image.Exif()
+    exif[0x013B] = 'Artist'
+    exif[0x010F] = 'Camera'
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG', exif=exif.tobytes())
+    return SimpleUploadedFile(
+        'picture.png', buffer.getvalue(), content_type='image/png'
+    )
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_IMAGE_MAX_SIZE=(100, 100)
+)
+class UploadNormalizationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def save_post(self, image):
+        form = PostForm({'text': 'Фото'}, {'image': image})
+        self.assertTrue(form.is_valid(), form.errors)
+        form.instance.author = self.user
+        return form.save()
+
+    def test_photo_downscaled_rotated_and_stripped(self):
+        """Фото уменьшается, поворачивается по EXIF и теряет метаданные."""
+        post = self.save_post(photo())
+        self.assertEqual(
+            (post.image_width, post.image_height, post.image_format),
+            (67, 100, 'JPEG'),
+        )
+        with post.image.open('rb') as file_, Image.open(file_) as image:
+            self.assertEqual(image.size, (67, 100))
+            self.assertNotIn('exif', image.info)
+
+    def test_png_downscaled_and_stripped(self):
+        """Из PNG тоже удаляется EXIF, а не только из JPEG."""
+        post = self.save_post(png_with_exif())
+        self.assertEqual(
+            (post.image_width, post.image_height, post.image_format),
+            (100, 67, 'PNG'),
+        )
+        with post.image.open('rb') as file_, Image.open(file_) as image:
+            self.assertEqual(image.size, (100, 67))
+            self.assertNotIn('exif', image.info)
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=1000)
+    def test_too_many_pixels_rejected(self):
+        """Картинку больше POST_IMAGE_MAX_PIXELS форма не принимает."""
+        form = PostForm({'text': 'Фото'}, {'image': photo()})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['image'][0].code,
+                         'image_too_large')
+
+    def test_clear_resets_image_info(self):
+        """После удаления картинки её размеры и формат тоже очищаются."""
+        post = self.save_post(photo())
+        form = PostForm(
+            {'text': 'Без фото', 'image-clear': 'on'}, instance=post
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        post = form.save()
+        self.assertFalse(post.image)
+        self.assertEqual(
+            (post.image_width, post.image_height, post.image_format),
+            (None, None, ''),
+        )
+
+    def test_admin_add_post_with_author(self):
+        """В админке пост создаётся с автором, картинка нормализуется."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.post(reverse('admin:posts_post_add'), {
+            'text': 'Из админки', 'author': self.user.pk, 'image': photo(),
+        })
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get(text='Из админки')
+        self.assertEqual(post.author, self.user)
+        self.assertEqual((post.image_width, post.image_height), (67, 100))
@@ -6,14 +6,23 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.paginator import EmptyPage, Page
+from django.db import connection, transaction
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from mixer.backend.django import mixer
 
-from ..models import Comment, Follow, Group, Post
+from jobs.worker import Worker
+
+from ..caching import fragment_key, render_post_fragments
+from ..models import Comment, Follow, Group, InboxEntry, Post, UserStats
+from ..views import COMMENTS_PER_PAGE
+from .utils import run_on_commit
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 NUMBER_OF_TESTED_PAGES: int = 13
+NUMBER_OF_TESTED_COMMENTS: int = COMMENTS_PER_PAGE + 5
 
 User = get_user_model()
 
@@ -49,15 +58,45 @@ class PostPagesTests(TestCase):
         self.authorized_client_not_author.force_login(self.user_not_author)
 
     def test_cache_index_page(self):
-        """Проверяем работу кэша главной страницы"""
+        """Кэш главной страницы сбрасывается при изменении постов."""
         response = self.authorized_client_not_author.get(reverse('posts:index'))
         cached_response_content = response.content
-        Post.objects.create(text='Второй пост', author=self.user)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
         response = self.authorized_client_not_author.get(reverse('posts:index'))
         self.assertEqual(cached_response_content, response.content)
-        cache.clear()
+        Post.objects.create(text='Второй пост', author=self.user)
+        run_on_commit()
         response = self.authorized_client_not_author.get(reverse('posts:index'))
         self.assertNotEqual(cached_response_content, response.content)
+        self.assertContains(response, 'Второй пост')
+
+    def test_cache_invalidated_by_post_group_and_author(self):
+        """Кэш лент сбрасывается при изменении поста, группы и автора."""
+        other_group = Group.objects.create(
+            title='Другая группа', slug='other-slug', description='-'
+        )
+        group_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        profile_url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.assertContains(self.guest_client.get(group_url), 'Тестовый пост')
+        self.guest_client.get(profile_url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = other_group
+        post.save()
+        run_on_commit()
+        self.assertNotContains(
+            self.guest_client.get(group_url), 'Тестовый пост'
+        )
+        other_group.slug = 'renamed-slug'
+        other_group.save()
+        run_on_commit()
+        self.assertContains(self.guest_client.get(profile_url), 'renamed-slug')
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Новое имя'
+        author.save()
+        run_on_commit()
+        self.assertContains(
+            self.guest_client.get(reverse('posts:index')), 'Новое имя'
+        )
 
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
@@ -180,6 +219,316 @@ class PostPagesTests(TestCase):
         self.assertTrue(response.context.get('is_edit'))
 
 
+class PostFragmentCacheTest(TestCase):
+    """Фрагменты includes/post.html кэшируются по версии поста."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group
+        )
+
+    def test_fragment_reused_until_post_changes(self):
+        """Фрагмент берётся из кэша, пока пост не изменился."""
+        key = fragment_key(self.post, show_group_link=True)
+        render_post_fragments([self.post], show_group_link=True)
+        self.assertIn('Тестовый пост', cache.get(key))
+        Post.objects.filter(pk=self.post.pk).update(text='Без сохранения')
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(fragment_key(post, show_group_link=True), key)
+        [fragment] = render_post_fragments([post], show_group_link=True)
+        self.assertIn('Тестовый пост', fragment)
+        post.save()
+        [fragment] = render_post_fragments([post], show_group_link=True)
+        self.assertIn('Без сохранения', fragment)
+
+    def test_fragment_key_depends_on_links(self):
+        """Ключ учитывает флаги ссылок и данные, которые они выводят."""
+        post = Post.objects.select_related('author').get(pk=self.post.pk)
+        plain = fragment_key(post)
+        with_author = fragment_key(post, show_author_link=True)
+        self.assertNotEqual(plain, with_author)
+        post.author.first_name = 'Новое имя'
+        self.assertNotEqual(
+            fragment_key(post, show_author_link=True), with_author
+        )
+        self.assertEqual(fragment_key(post), plain)
+
+
+class AnonymousPageCacheTest(TestCase):
+    """Страницы для гостей кэшируются целиком и сбрасываются по тегам."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group
+        )
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_page_served_from_cache(self):
+        """Повторный запрос гостя отдаётся из кэша без запросов к БД."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_authorized_request_bypasses_cache(self):
+        """Запросы с сессией не читают и не пишут кэш страниц."""
+        url = reverse('posts:index')
+        response = self.authorized_client.get(url)
+        self.assertNotIn('X-Page-Cache', response)
+        response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_pages_purged_by_tags(self):
+        """Изменения поста, комментария и группы сбрасывают страницы."""
+        detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        profile_url = reverse(
+            'posts:profile', kwargs={'username': self.user.username}
+        )
+        index_url = reverse('posts:index')
+        changes = (
+            (detail_url, lambda: Comment.objects.create(
+                post=self.post, author=self.user, text='Комментарий'
+            )),
+            (index_url, lambda: Post.objects.filter(
+                pk=self.post.pk
+            ).first().save()),
+            (profile_url, lambda: Post.objects.create(
+                text='Новый пост', author=self.user
+            )),
+            (index_url, lambda: Group.objects.get(pk=self.group.pk).save()),
+        )
+        for url, change in changes:
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                self.assertEqual(
+                    self.guest_client.get(url)['X-Page-Cache'], 'hit'
+                )
+                change()
+                run_on_commit()
+                self.assertEqual(
+                    self.guest_client.get(url)['X-Page-Cache'], 'miss'
+                )
+
+    def test_pages_purged_after_commit(self):
+        """Страница сбрасывается только после коммита."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        Post.objects.create(text='Новый пост', author=self.user)
+        self.assertEqual(self.guest_client.get(url)['X-Page-Cache'], 'hit')
+        run_on_commit()
+        self.assertEqual(self.guest_client.get(url)['X-Page-Cache'], 'miss')
+
+    def test_unrelated_change_keeps_page(self):
+        """Изменения в другой группе не сбрасывают страницу группы."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.guest_client.get(url)
+        other_group = Group.objects.create(
+            title='Другая группа', slug='other-slug', description='-'
+        )
+        Post.objects.create(
+            text='Чужой пост',
+            author=User.objects.create_user(username='other'),
+            group=other_group,
+        )
+        self.assertEqual(self.guest_client.get(url)['X-Page-Cache'], 'hit')
+
+
+class ConditionalGetTest(TestCase):
+    """Ленты и страница поста отвечают 304, если ничего не изменилось."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group
+        )
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def get_again(self, client, url):
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified_without_rendering(self):
+        """Совпавший ETag даёт 304 без рендеринга шаблона."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        for client in (self.guest_client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.get_again(client, url)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(response.templates, [])
+
+    def test_changes_reset_etag(self):
+        """Пост, комментарий и подписка меняют ETag."""
+        index_url = reverse('posts:index')
+        detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        profile_url = reverse('posts:profile', kwargs={'username': 'author'})
+        changes = (
+            (index_url, lambda: Post.objects.create(
+                text='Новый пост', author=self.user
+            )),
+            (detail_url, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Комментарий'
+            )),
+            (profile_url, lambda: Follow.objects.create(
+                user=self.reader, author=self.user
+            )),
+        )
+        for url, change in changes:
+            with self.subTest(url=url):
+                etag = self.authorized_client.get(url)['ETag']
+                change()
+                run_on_commit()
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_after_commit(self):
+        """ETag меняется только после коммита правки."""
+        run_on_commit()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        etags = {url: self.authorized_client.get(url)['ETag'] for url in urls}
+        with transaction.atomic():
+            Post.objects.filter(pk=self.post.pk).first().save()
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.authorized_client.get(url)
+                    self.assertEqual(response['ETag'], etags[url])
+        run_on_commit()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etags[url])
+
+    def test_new_login_resets_etag(self):
+        """После повторного входа страница с формой рендерится заново."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        etag = self.authorized_client.get(url)['ETag']
+        self.authorized_client.logout()
+        self.authorized_client.force_login(self.reader)
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_viewer_and_cursor(self):
+        """ETag различается для гостя, пользователя и страниц ленты."""
+        url = reverse('posts:index')
+        etags = {
+            self.guest_client.get(url)['ETag'],
+            self.authorized_client.get(url)['ETag'],
+            self.guest_client.get(url, {'cursor': 'x'})['ETag'],
+        }
+        self.assertEqual(len(etags), 3)
+
+
+class CommentsPaginationTest(TestCase):
+    """Комментарии выводятся страницами и подгружаются фрагментами."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {n}')
+            for n in range(NUMBER_OF_TESTED_COMMENTS)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_initial_render_is_capped(self):
+        """На странице поста только первая страница комментариев."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertTrue(comments.has_next())
+        self.assertContains(
+            response,
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_fragment_serves_next_page(self):
+        """Фрагмент отдаёт следующую страницу без повторов."""
+        first = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        ).context['comments']
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'cursor': first.next_cursor},
+        )
+        self.assertTemplateUsed(response, 'includes/comments.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        rest = response.context['comments']
+        self.assertEqual(
+            len(rest), NUMBER_OF_TESTED_COMMENTS - COMMENTS_PER_PAGE
+        )
+        self.assertFalse(rest.has_next())
+        self.assertFalse({c.pk for c in first} & {c.pk for c in rest})
+
+    def test_fragment_for_missing_post(self):
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
 class PaginatorViewsTest(TestCase):
     """Тестируется paginator."""
 
@@ -221,21 +570,120 @@ class PaginatorViewsTest(TestCase):
                      kwargs={'slug': self.group.slug})): TEN_POSTS,
             (reverse('posts:profile',
                      kwargs={'username': self.user})): TEN_POSTS,
-            (reverse('posts:index') + '?page=2'): THREE_POSTS,
-            (reverse('posts:group_list',
-                     kwargs={'slug': self.group.slug}) + '?page=2'
-             ): THREE_POSTS,
-            (reverse('posts:profile',
-                     kwargs={'username': self.user}) + '?page=2'
-             ): THREE_POSTS,
             reverse('posts:follow_index'): TEN_POSTS,
-            reverse('posts:follow_index') + '?page=2': THREE_POSTS
         }
         for value, expected in first_page.items():
             with self.subTest(value=value):
                 response = self.authorized_client.get(value)
                 self.assertEqual(
                     len(response.context['page_obj']), expected)
+        first_page = self.authorized_client.get(
+            reverse('posts:follow_index')).context['page_obj']
+        response = self.authorized_client.get(
+            reverse('posts:follow_index'), {'cursor': first_page.next_cursor})
+        self.assertEqual(len(response.context['page_obj']), THREE_POSTS)
+
+    def test_cursor_pages(self):
+        """Курсорные ленты листаются вперёд и назад без пропусков."""
+        feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        ]
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True)
+        )
+        for feed in feeds:
+            with self.subTest(feed=feed):
+                first_page = self.authorized_client.get(
+                    feed).context['page_obj']
+                self.assertFalse(first_page.has_previous())
+                second_page = self.authorized_client.get(
+                    feed + f'?cursor={first_page.next_cursor}'
+                ).context['page_obj']
+                self.assertFalse(second_page.has_next())
+                self.assertEqual(
+                    [post.pk for post in first_page]
+                    + [post.pk for post in second_page],
+                    expected,
+                )
+                back_page = self.authorized_client.get(
+                    feed + f'?cursor={second_page.previous_cursor}'
+                ).context['page_obj']
+                self.assertEqual(
+                    [post.pk for post in back_page],
+                    [post.pk for post in first_page],
+                )
+
+    def test_cursor_page_numbers(self):
+        """Номер страницы переносится в курсоре, счёт — по требованию."""
+        url = reverse('posts:index')
+        first_page = self.authorized_client.get(url).context['page_obj']
+        second_page = self.authorized_client.get(
+            url, {'cursor': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertEqual((first_page.number, first_page.start_index()),
+                         (1, 1))
+        self.assertEqual(first_page.next_page_number(), 2)
+        self.assertEqual(second_page.number, 2)
+        self.assertEqual(second_page.previous_page_number(), 1)
+        self.assertEqual((second_page.start_index(), second_page.end_index()),
+                         (11, 13))
+        with self.assertRaises(EmptyPage):
+            second_page.next_page_number()
+        self.assertEqual(second_page.paginator.num_pages, 2)
+        self.assertEqual(list(second_page.paginator.page_range), [1, 2])
+
+    def test_follow_cursor_pages(self):
+        """Лента подписок листается курсором, а страница — Page."""
+        Follow.objects.create(user=self.user_1, author=self.user)
+        url = reverse('posts:follow_index')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        first_page = response.context['page_obj']
+        self.assertIs(type(first_page), Page)
+        self.assertFalse(
+            any('COUNT(*)' in query['sql'] for query in queries)
+        )
+        self.assertFalse(
+            any('OFFSET' in query['sql'] for query in queries)
+        )
+        self.assertTrue(first_page.has_next())
+        self.assertIsNone(first_page.previous_cursor)
+        self.assertContains(response, f'?cursor={first_page.next_cursor}')
+        second_page = self.authorized_client.get(
+            url, {'cursor': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(second_page.number, 2)
+        self.assertFalse(second_page.has_next())
+        self.assertIsNone(second_page.next_cursor)
+        self.assertEqual(
+            [post.pk for post in first_page]
+            + [post.pk for post in second_page],
+            list(Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True)),
+        )
+        back_page = self.authorized_client.get(
+            url, {'cursor': second_page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back_page), list(first_page))
+
+    def test_cursor_page_skips_count(self):
+        """Курсорная лента не выполняет COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(reverse('posts:index'))
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор открывает первую страницу."""
+        response = self.authorized_client.get(
+            reverse('posts:index') + '?cursor=broken')
+        page_obj = response.context['page_obj']
+        self.assertFalse(page_obj.has_previous())
+        self.assertEqual(len(page_obj), 10)
 
 
 class FollowTest(TestCase):
@@ -267,6 +715,122 @@ class FollowTest(TestCase):
         user_unfollow.delete()
         self.assertEqual(Follow.objects.count(), follow_count - 1)
 
+    def test_new_post_delivered_to_follower_inbox(self):
+        """Новый пост автора попадает во входящие подписчика."""
+        Follow.objects.create(user=self.user, author=self.user_2)
+        post = Post.objects.create(text='Новый пост', author=self.user_2)
+        self.assertTrue(
+            InboxEntry.objects.filter(user=self.user, post=post).exists()
+        )
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertIn(post, response.context['page_obj'])
+
+    def test_follow_backfills_and_unfollow_prunes_inbox(self):
+        """Подписка заполняет входящие, отписка очищает."""
+        Post.objects.create(text='Старый пост', author=self.user_2)
+        self.authorized_client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.user_2.username}))
+        self.assertEqual(self.user.inbox.count(), 1)
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.user_2.username}))
+        self.assertEqual(self.user.inbox.count(), 0)
+
+    @override_settings(FEED_FANOUT_THRESHOLD=0)
+    def test_popular_author_merged_at_read_time(self):
+        """Посты популярного автора подмешиваются в ленту при чтении."""
+        Follow.objects.create(user=self.user, author=self.user_2)
+        post = Post.objects.create(text='Новый пост', author=self.user_2)
+        self.assertFalse(InboxEntry.objects.filter(post=post).exists())
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertIn(post, response.context['page_obj'])
+
+    @override_settings(FEED_FANOUT_THRESHOLD=1)
+    def test_merged_feed_pages(self):
+        """
+        Лента из входящих и «тяжёлого» автора листается без пропусков
+        и повторов; из каждой выборки читается не больше страницы.
+        """
+        user_3 = User.objects.create_user(username='auth_3')
+        user_4 = User.objects.create_user(username='auth_4')
+        Follow.objects.create(user=self.user, author=self.user_2)
+        Follow.objects.create(user=self.user, author=user_4)
+        for number in range(8):
+            Post.objects.create(text=f'До порога {number}', author=self.user_2)
+            Post.objects.create(text=f'Входящие {number}', author=user_4)
+        Follow.objects.create(user=user_3, author=self.user_2)
+        for number in range(8):
+            Post.objects.create(text=f'После {number}', author=self.user_2)
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        self.assertEqual(len(expected), 24)
+
+        url = reverse('posts:follow_index')
+        with CaptureQueriesContext(connection) as queries:
+            first_page = self.authorized_client.get(url).context['page_obj']
+        post_queries = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT "posts_post"')
+        ]
+        self.assertEqual(len(post_queries), 2)
+        self.assertTrue(all('LIMIT 11' in sql for sql in post_queries))
+        pages = [first_page]
+        while pages[-1].has_next():
+            pages.append(self.authorized_client.get(
+                url, {'cursor': pages[-1].next_cursor}
+            ).context['page_obj'])
+        self.assertEqual([post for page in pages for post in page], expected)
+        back_page = self.authorized_client.get(
+            url, {'cursor': pages[-1].previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back_page), list(pages[-2]))
+        self.assertEqual(first_page.paginator.count, 24)
+
+    @override_settings(FEED_FANOUT_THRESHOLD=1)
+    def test_author_below_threshold_backfills_followers(self):
+        """Автор, опустившийся до порога, снова раздаёт посты во входящие."""
+        user_3 = User.objects.create_user(username='auth_3')
+        Follow.objects.create(user=self.user, author=self.user_2)
+        Follow.objects.create(user=user_3, author=self.user_2)
+        post = Post.objects.create(text='Новый пост', author=self.user_2)
+        self.assertFalse(self.user.inbox.exists())
+        Follow.objects.filter(user=user_3).delete()
+        self.assertFalse(self.user.inbox.exists())
+        Worker(name='worker').run(burst=True)
+        self.assertTrue(
+            InboxEntry.objects.filter(user=self.user, post=post).exists()
+        )
+
+    @override_settings(FEED_FANOUT_THRESHOLD=2)
+    def test_batch_unfollow_past_threshold_backfills(self):
+        """Пачка отписок, перешагнувшая порог, тоже догоняет входящие."""
+        others = [
+            User.objects.create_user(username=f'other_{number}')
+            for number in range(3)
+        ]
+        for user in (self.user, *others):
+            Follow.objects.create(user=user, author=self.user_2)
+        post = Post.objects.create(text='Новый пост', author=self.user_2)
+        self.assertFalse(self.user.inbox.exists())
+        Follow.objects.filter(user__in=others).delete()
+        self.assertEqual(
+            UserStats.objects.get(user=self.user_2).followers_count, 1
+        )
+        Worker(name='worker').run(burst=True)
+        self.assertTrue(
+            InboxEntry.objects.filter(user=self.user, post=post).exists()
+        )
+
+    def test_fan_out_reads_counter(self):
+        """Раздача поста не считает подписчиков по таблице Follow."""
+        Follow.objects.create(user=self.user, author=self.user_2)
+        with CaptureQueriesContext(connection) as queries:
+            Post.objects.create(text='Новый пост', author=self.user_2)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] and 'posts_follow' in query['sql']
+            for query in queries
+        ))
+
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class ImagesTests(TestCase):
@@ -298,6 +862,7 @@ class ImagesTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
 
     def test_image_index_group_profile(self):
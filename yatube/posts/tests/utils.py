@@ -0,0 +1,31 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def run_on_commit():
+    """
+    Выполняет колбэки transaction.on_commit: TestCase не коммитит,
+    и без этого сброс кэшей после коммита в тестах не наступает.
+    """
+    callbacks = connection.run_on_commit
+    connection.run_on_commit = []
+    for _, callback in callbacks:
+        callback()
+
+
+class QueryBudgetMixin:
+    """Проверка точного числа SQL-запросов, которые делает страница."""
+
+    def assertQueryBudget(self, client, url, budget):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        executed = [query['sql'] for query in queries]
+        self.assertEqual(
+            len(executed), budget,
+            '{url}: ожидалось запросов {budget}, выполнено {count}:\n'
+            '{sql}'.format(
+                url=url, budget=budget, count=len(executed),
+                sql='\n'.join(executed),
+            ),
+        )
+        return response
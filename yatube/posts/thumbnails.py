@@ -0,0 +1,190 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post, StoredImage, post_image_storage
+
+logger = logging.getLogger(__name__)
+
+POST_THUMBNAIL_GEOMETRY: str = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+POST_THUMBNAIL_FORMAT: str = 'JPEG'
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+
+
+class CachedThumbnailBackend(ThumbnailBackend):
+    """
+    Бэкенд sorl, который ищет готовые миниатюры без их создания
+    и создаёт сразу несколько вариантов из одного декодирования.
+    """
+
+    def thumbnail_file(self, source, geometry_string, options):
+        """Файл миниатюры, как его назвал бы get_thumbnail()."""
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage), options
+
+    def get_cached_thumbnail(self, file_, geometry_string, **options):
+        """
+        Готовая миниатюра из хранилища ключей sorl или None.
+        Изображение при этом не открывается и не создаётся.
+        """
+        thumbnail, _ = self.thumbnail_file(
+            ImageFile(file_), geometry_string, options
+        )
+        return default.kvstore.get(thumbnail)
+
+    def create_thumbnails(self, file_, variants, **options):
+        """
+        Создаёт недостающие миниатюры для (геометрия, формат) из variants.
+        Исходник декодируется один раз на все варианты.
+        """
+        source = ImageFile(file_)
+        missing = []
+        for geometry_string, format_ in variants:
+            thumbnail, variant_options = self.thumbnail_file(
+                source, geometry_string, {**options, 'format': format_}
+            )
+            if not default.kvstore.get(thumbnail):
+                missing.append((geometry_string, thumbnail, variant_options))
+        if not missing:
+            return
+        source_image = default.engine.get_image(source)
+        try:
+            image_info = default.engine.get_image_info(source_image)
+            source.set_size(default.engine.get_image_size(source_image))
+            for geometry_string, thumbnail, variant_options in missing:
+                if (
+                    thumbnail_settings.THUMBNAIL_FORCE_OVERWRITE
+                    or not thumbnail.exists()
+                ):
+                    variant_options['image_info'] = image_info
+                    self._create_thumbnail(
+                        source_image, geometry_string, variant_options,
+                        thumbnail,
+                    )
+                default.kvstore.get_or_set(source)
+                default.kvstore.set(thumbnail, source)
+        finally:
+            default.engine.cleanup(source_image)
+
+
+backend = CachedThumbnailBackend()
+
+
+def thumbnail_formats():
+    """Форматы из POST_THUMBNAIL_FORMATS, которые умеет сохранять Pillow."""
+    Image.init()
+    return [
+        format_ for format_ in settings.POST_THUMBNAIL_FORMATS
+        if format_ in Image.SAVE
+    ]
+
+
+def thumbnail_variants():
+    """Все (геометрия, формат) миниатюр поста; основная — первой."""
+    variants = [(POST_THUMBNAIL_GEOMETRY, POST_THUMBNAIL_FORMAT)]
+    for format_ in thumbnail_formats():
+        for geometry in settings.POST_THUMBNAIL_GEOMETRIES:
+            if (geometry, format_) not in variants:
+                variants.append((geometry, format_))
+    return variants
+
+
+def cached_post_thumbnail(image):
+    """Основная миниатюра поста — 960x339 в JPEG — или None."""
+    if not image:
+        return None
+    return backend.get_cached_thumbnail(
+        image, POST_THUMBNAIL_GEOMETRY,
+        format=POST_THUMBNAIL_FORMAT, **POST_THUMBNAIL_OPTIONS
+    )
+
+
+def post_picture(image):
+    """
+    Готовые варианты миниатюры для <picture>: основная для src
+    и srcset по каждому формату, от меньшей ширины к большей.
+    """
+    fallback = cached_post_thumbnail(image)
+    if fallback is None:
+        return None
+    widths = {}
+    for geometry, format_ in thumbnail_variants():
+        thumbnail = backend.get_cached_thumbnail(
+            image, geometry, format=format_, **POST_THUMBNAIL_OPTIONS
+        )
+        if thumbnail is not None:
+            widths.setdefault(format_, {})[thumbnail.width] = thumbnail.url
+    sources = [
+        {
+            'type': MIME_TYPES[format_],
+            'srcset': ', '.join(
+                f'{url} {width}w' for width, url in sorted(urls.items())
+            ),
+        }
+        for format_, urls in widths.items()
+    ]
+    # Браузер берёт первый подходящий <source>: JPEG — запасной вариант.
+    sources.sort(key=lambda source: source['type'] == 'image/jpeg')
+    return {
+        'src': fallback.url,
+        'sources': sources,
+        'sizes': settings.POST_THUMBNAIL_SIZES,
+    }
+
+
+def generate_post_thumbnail(name):
+    """
+    Создаёт все варианты миниатюры поста.
+    Посты с одинаковой картинкой ссылаются на один файл, и миниатюры
+    для него создаются один раз.
+    """
+    backend.create_thumbnails(
+        ImageFile(name, post_image_storage), thumbnail_variants(),
+        **POST_THUMBNAIL_OPTIONS
+    )
+    return name
+
+
+def delete_unreferenced_image(name):
+    """Удаляет файл картинки и его миниатюры, если ссылок не осталось."""
+    if StoredImage.objects.filter(name=name).exists():
+        # Пока удаление ждало коммита, тот же файл загрузили снова.
+        return
+    try:
+        backend.delete(ImageFile(name, post_image_storage))
+    except (OSError, SuspiciousFileOperation):
+        logger.warning('Не удалось удалить картинку %s', name, exc_info=True)
+
+
+def refresh_post(post_id):
+    """
+    Сохраняет пост заново, чтобы сбросить фрагменты и страницы,
+    которые успели закэшироваться с заглушкой вместо миниатюры.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        post.save(update_fields=('updated',))
@@ -0,0 +1,98 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps
+
+# Во что пересохраняется картинка; остальные форматы — в PNG.
+OUTPUT_FORMATS = {
+    'JPEG': 'JPEG',
+    'MPO': 'JPEG',
+    'PNG': 'PNG',
+    'GIF': 'GIF',
+    'WEBP': 'WEBP',
+}
+EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+}
+CONTENT_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+
+
+def check_dimensions(width, height):
+    """
+    Отклоняет картинку по размерам из заголовка, до декодирования:
+    так маленький файл не развернётся в гигабайты памяти.
+    """
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Картинка слишком большая: %(width)s×%(height)s пикселей.',
+            code='image_too_large',
+            params={'width': width, 'height': height},
+        )
+
+
+def save_options(format_, image):
+    options = {}
+    if format_ == 'JPEG':
+        options.update(quality=settings.POST_IMAGE_QUALITY, optimize=True)
+    elif format_ == 'PNG':
+        options.update(optimize=True)
+    elif format_ == 'WEBP':
+        options.update(quality=settings.POST_IMAGE_QUALITY)
+    if format_ != 'GIF' and image.info.get('icc_profile'):
+        # Цветовой профиль нужен для правильных цветов, остальные
+        # метаданные (EXIF, XMP, комментарии) не сохраняются.
+        options['icc_profile'] = image.info['icc_profile']
+    return options
+
+
+def normalize_image(upload):
+    """
+    Готовит загруженную картинку к хранению: отклоняет слишком большие
+    по заголовку, поворачивает по EXIF, уменьшает до POST_IMAGE_MAX_SIZE
+    и пересохраняет без метаданных. Анимированные и небольшие GIF
+    остаются как есть.
+
+    Возвращает файл для сохранения и словарь width, height, format.
+    """
+    upload.seek(0)
+    with Image.open(upload) as image:
+        width, height = image.size
+        check_dimensions(width, height)
+        format_ = OUTPUT_FORMATS.get(image.format, 'PNG')
+        max_width, max_height = settings.POST_IMAGE_MAX_SIZE
+        fits = width <= max_width and height <= max_height
+        if format_ == 'GIF' and (fits or getattr(image, 'is_animated', False)):
+            upload.seek(0)
+            return upload, {'width': width, 'height': height, 'format': 'GIF'}
+
+        # Уменьшение до декодирования: для JPEG Pillow читает
+        # сразу уменьшенную копию.
+        image.thumbnail(settings.POST_IMAGE_MAX_SIZE, Image.LANCZOS)
+        normalized = ImageOps.exif_transpose(image)
+        if format_ == 'JPEG' and normalized.mode not in ('RGB', 'L', 'CMYK'):
+            normalized = normalized.convert('RGB')
+        # exif_transpose() возвращает остаток EXIF в info, а PNG
+        # сохраняет info['exif'] сам; нужное берётся из image.
+        normalized.info = {}
+        buffer = BytesIO()
+        normalized.save(buffer, format_, **save_options(format_, image))
+
+    name = os.path.splitext(upload.name)[0] + EXTENSIONS[format_]
+    return SimpleUploadedFile(
+        name, buffer.getvalue(), content_type=CONTENT_TYPES[format_]
+    ), {
+        'width': normalized.width,
+        'height': normalized.height,
+        'format': format_,
+    }
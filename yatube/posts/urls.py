@@ -8,12 +8,33 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'feeds/<str:feed_format>/',
+        views.index_syndication,
+        name='index_syndication',
+    ),
+    path(
+        'group/<slug:slug>/feeds/<str:feed_format>/',
+        views.group_syndication,
+        name='group_syndication',
+    ),
+    path(
+        'profile/<str:username>/feeds/<str:feed_format>/',
+        views.profile_syndication,
+        name='profile_syndication',
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
+    path('search/', views.search, name='search'),
     path('follow/', views.follow_index, name='follow_index'),
     path(
         'profile/<str:username>/follow/',
@@ -1,72 +1,215 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import condition
 
+from core.page_cache import tag_response
+
+from .caching import (feed_etag, group_version, index_version, page_tags,
+                      post_etag, post_tags, profile_version)
+from .feeds import (FOLLOW_FEED_KEY, comment_list, follow_sources,
+                    group_feed, index_feed, profile_feed)
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .paginators import (CursorPaginator, MergedCursorPaginator,
+                         PageMergedCursorPaginator)
+from .search import SearchPaginator
+from .syndication import FEED_CLASSES, feed_response
 
 POSTS_PER_PAGE: int = 10
+COMMENTS_PER_PAGE: int = 20
 
 
-def pagination(request, object_list, per_page=POSTS_PER_PAGE):
+def pagination(request, object_list, per_page=POSTS_PER_PAGE, cursor=False):
+    """
+    Страница ленты. Большие ленты листаются курсором (?cursor=...),
+    небольшие — по номеру страницы (?page=N).
+    """
+    if cursor:
+        paginator = CursorPaginator(object_list, per_page)
+        return paginator.get_page(request.GET.get('cursor'))
     paginator = Paginator(object_list, per_page)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
+def follow_pagination(request, paginator_class=MergedCursorPaginator):
+    """Страница ленты подписок: входящие и «тяжёлые» авторы вместе."""
+    paginator = paginator_class(
+        follow_sources(request.user), POSTS_PER_PAGE, FOLLOW_FEED_KEY
+    )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+@condition(etag_func=feed_etag)
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.all()
-    page_obj = pagination(request, object_list=post_list)
+    page_obj = pagination(request, object_list=index_feed(), cursor=True)
     context = {
         'page_obj': page_obj,
-        'index': True
+        'index': True,
+        'cache_version': index_version(),
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context),
+        'feed:index', *page_tags(page_obj),
+    )
 
 
+@condition(etag_func=feed_etag)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = pagination(request, object_list=posts)
+    page_obj = pagination(request, object_list=group_feed(group), cursor=True)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'cache_version': group_version(group),
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context),
+        f'group:{group.pk}', *page_tags(page_obj),
+    )
 
 
+@condition(etag_func=feed_etag)
 def profile(request, username):
     template = 'posts/profile.html'
-    profile = get_object_or_404(User, username=username)
-    posts = profile.posts.all()
-    page_obj = pagination(request, object_list=posts)
+    profile = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    page_obj = pagination(
+        request, object_list=profile_feed(profile), cursor=True
+    )
     following = request.user.is_authenticated and Follow.objects.filter(
         user=request.user, author=profile).exists()
     context = {
         'profile': profile,
         'page_obj': page_obj,
-        'following': following
+        'following': following,
+        'cache_version': profile_version(profile),
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context),
+        f'user:{profile.pk}', *page_tags(page_obj),
+    )
 
 
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
     form = CommentForm()
-    comments = post.comments.all()
+    comments = pagination(
+        request,
+        object_list=comment_list(post),
+        per_page=COMMENTS_PER_PAGE,
+        cursor=True,
+    )
     context = {
         'post': post,
         'form': form,
         'comments': comments,
     }
-    return render(request, template, context)
+    return tag_response(
+        render(request, template, context),
+        *post_tags(post),
+        *(f'user:{comment.author_id}' for comment in comments),
+    )
+
+
+@condition(etag_func=post_etag)
+def post_comments(request, post_id):
+    """Следующая страница комментариев для подгрузки на post_detail."""
+    template = 'includes/comments.html'
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    comments = pagination(
+        request,
+        object_list=comment_list(post),
+        per_page=COMMENTS_PER_PAGE,
+        cursor=True,
+    )
+    context = {
+        'post': post,
+        'comments': comments,
+    }
+    return tag_response(
+        render(request, template, context),
+        f'post:{post.pk}',
+        *(f'user:{comment.author_id}' for comment in comments),
+    )
+
+
+@condition(etag_func=feed_etag)
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    paginator = SearchPaginator(query, POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return tag_response(
+        render(request, template, context),
+        'feed:index', *page_tags(page_obj),
+    )
+
+
+def syndication_format(feed_format):
+    if feed_format not in FEED_CLASSES:
+        raise Http404('Неизвестный формат ленты.')
+    return feed_format
+
+
+def index_syndication(request, feed_format):
+    return feed_response(
+        request,
+        syndication_format(feed_format),
+        index_feed(),
+        index_version(),
+        title='Yatube: последние записи',
+        link=reverse('posts:index'),
+        description='Новые записи всех авторов.',
+    )
+
+
+def group_syndication(request, slug, feed_format):
+    feed_format = syndication_format(feed_format)
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(
+        request,
+        feed_format,
+        group_feed(group),
+        group_version(group),
+        title=f'Yatube: {group.title}',
+        link=reverse('posts:group_list', args=(group.slug,)),
+        description=group.description,
+    )
+
+
+def profile_syndication(request, username, feed_format):
+    feed_format = syndication_format(feed_format)
+    profile = get_object_or_404(User, username=username)
+    return feed_response(
+        request,
+        feed_format,
+        profile_feed(profile),
+        profile_version(profile),
+        title=f'Yatube: {profile.get_full_name() or profile.username}',
+        link=reverse('posts:profile', args=(profile.username,)),
+        description=f'Записи пользователя {profile.username}.',
+    )
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm(
@@ -108,6 +251,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     template = 'posts:post_detail'
     post = get_object_or_404(Post, pk=post_id)
@@ -123,8 +267,8 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page_obj = pagination(request, object_list=post_list)
+    # Лента подписок листается курсором, но страница остаётся Page.
+    page_obj = follow_pagination(request, PageMergedCursorPaginator)
     context = {
         'page_obj': page_obj,
         'follow': True
@@ -133,6 +277,7 @@ def follow_index(request):
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user != author:
@@ -141,6 +286,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.get(user=request.user, author=author).delete()
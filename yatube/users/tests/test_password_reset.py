@@ -0,0 +1,48 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.worker import Worker
+
+User = get_user_model()
+
+
+class QueuedPasswordResetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='leo', email='leo@example.com', password='secret'
+        )
+
+    def test_reset_link_not_stored_in_queue(self):
+        """В задаче только pk пользователя, письмо собирается при отправке."""
+        response = self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'leo@example.com'},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'users.tasks.send_password_reset')
+        self.assertNotIn('/auth/reset/', job.payload)
+        self.assertNotIn('leo@example.com', job.payload)
+
+        Worker(name='worker').run(burst=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['leo@example.com'])
+        link = re.search(r'/auth/reset/\S+', mail.outbox[0].body)
+        self.assertIsNotNone(link)
+        self.assertNotIn(link.group().rstrip('/').split('/')[-1], job.payload)
+        self.assertFalse(Job.objects.exists())
+
+    def test_unknown_email_enqueues_nothing(self):
+        self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'nobody@example.com'},
+        )
+        self.assertFalse(Job.objects.exists())
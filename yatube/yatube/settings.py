@@ -46,24 +46,79 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
-INTERNAL_IPS = [
-    '127.0.0.1',
-]
+if DEBUG:
+    MIDDLEWARE.append('core.middleware.QueryCountMiddleware')
+
+# превышение бюджета запросов — ошибка; включается в тестах
+# (core.testing.TestRunner и conftest.py)
+QUERY_GUARD_RAISE = False
+
+# максимальное число SQL-запросов для страницы
+QUERY_BUDGETS = {
+    'posts:index': 5,
+    'posts:group_list': 7,
+    'posts:profile': 7,
+    'posts:post_detail': 6,
+    'posts:post_comments': 4,
+    'posts:search': 5,
+    'api:index': 5,
+    'api:group_list': 7,
+    'api:profile': 7,
+    'api:post_detail': 6,
+    'api:post_comments': 4,
+    'api:follow_index': 7,
+    'posts:follow_index': 7,
+}
+# фоновые задачи: процессы runworker, сколько задач каждой очереди
+# выполняется одновременно, число попыток и задержка между ними
+# (удваивается с каждой попыткой), как часто обработчик продлевает
+# захват задачи, когда задачу без продления вернуть в очередь и как
+# часто спрашивать базу, если задач нет; секунды
+JOB_WORKERS = 2
+JOB_QUEUES = {'default': 4, 'thumbnails': 2, 'email': 1}
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_RETRY_MAX_DELAY = 60 * 60
+JOB_HEARTBEAT_INTERVAL = 60
+JOB_TIMEOUT = 60 * 10
+JOB_POLL_INTERVAL = 1
+# метаданные sorl-thumbnail хранятся в отдельном SQLite-файле (WAL),
+# общем для всех процессов, а не в основной базе
+THUMBNAIL_KVSTORE = 'core.kvstore.SQLiteKVStore'
+THUMBNAIL_KVSTORE_PATH = os.path.join(BASE_DIR, 'thumbnails.sqlite3')
+# варианты миниатюр постов для srcset: геометрии, форматы по порядку
+# предпочтения (неподдерживаемые Pillow пропускаются) и атрибут sizes
+POST_THUMBNAIL_GEOMETRIES = ('480x170', '960x339', '1440x508')
+POST_THUMBNAIL_FORMATS = ('WEBP', 'JPEG')
+POST_THUMBNAIL_SIZES = '(max-width: 992px) 100vw, 960px'
+# загруженные картинки больше POST_IMAGE_MAX_PIXELS пикселей отклоняются
+# по заголовку, больше POST_IMAGE_MAX_SIZE — уменьшаются до него
+# и пересохраняются без метаданных с качеством POST_IMAGE_QUALITY
+POST_IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+POST_IMAGE_MAX_SIZE = (2560, 2560)
+POST_IMAGE_QUALITY = 85
+# сколько живёт страница в кэше для гостей, если её теги не сброшены
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# таблицы, запросы к которым не входят в бюджет
+QUERY_GUARD_IGNORE = ()
 
 ROOT_URLCONF = 'yatube.urls'
 
@@ -97,9 +152,16 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # таблица кэша (CACHES), см. core.routers.CacheRouter
+    'cache': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'cache.sqlite3'),
+    },
 }
 
+DATABASE_ROUTERS = ['core.routers.CacheRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -151,8 +213,27 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# кэш общий для всех процессов: версии фрагментов, теги страниц
+# и ETag сбрасываются сигналом в одном процессе, а видны всем.
+# DatabaseCache в базе 'cache': запись по первичному ключу не дорожает
+# с числом записей (FileBasedCache обходит весь каталог на каждой).
+# Таблица создаётся после migrate командой
+# python manage.py createcachetable --database cache.
+# При нескольких серверах подойдёт Memcached или Redis.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
+
+# тесты работают с кэшем во временном каталоге и падают
+# при превышении бюджета запросов
+TEST_RUNNER = 'core.testing.TestRunner'
+
+# авторы, у которых подписчиков больше порога, не раскладывают посты
+# по входящим подписчиков: их посты подмешиваются в ленту при чтении;
+# порог — пересечение цен записи и чтения из manage.py feed_benchmark
+# при READS_PER_POST чтениях ленты на пост
+FEED_FANOUT_THRESHOLD = 1000